@@ -0,0 +1,75 @@
+"""Scaling benchmark for the parallel N26 reader.
+
+Generates a synthetic N26 CSV file and reads it with 1 to N worker
+processes, printing the time taken and the speedup over the sequential
+reader.
+
+    python benchmarks/n26_parallel.py --rows 1000000 --max-workers 8
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from ynabkit import payee
+from ynabkit.n26.inputs import ParallelTransactionsInput, TransactionsInput
+
+
+def write_csv(path: str, rows: int):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "Booking Date", "Value Date", "Partner Name", "Partner Iban", "Type",
+            "Payment Reference", "Account Name", "Amount (EUR)", "Original Amount",
+            "Original Currency", "Exchange Rate",
+        ])
+        for i in range(rows):
+            writer.writerow([
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                f"Shop {i % 5000}",
+                "IT60X0542811101000000123456",
+                "Presentment",
+                f"Invoice {i}\nsecond line" if i % 100 == 0 else "",
+                "Main Account",
+                f"-{i % 1000}.{i % 100:02d}",
+                f"-{i % 1000}.{i % 100:02d}",
+                "EUR",
+                "1.0",
+            ])
+
+
+def resolver() -> payee.PayeeResolver:
+    payee_resolver = payee.PayeeResolver()
+    payee_resolver.load_mappings([
+        {"name": f"Payee {i}", "patterns": [f"^Shop {i}$"]}
+        for i in range(0, 5000, 50)
+    ])
+    return payee_resolver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "n26.csv")
+        write_csv(path, args.rows)
+
+        start = time.perf_counter()
+        TransactionsInput(path, skip_header=True, payee_resolver=resolver()).read()
+        baseline = time.perf_counter() - start
+        print(f"sequential: {baseline:.2f}s")
+
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            ParallelTransactionsInput(path, skip_header=True, payee_resolver=resolver(), workers=workers).read()
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>2} workers: {elapsed:.2f}s ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
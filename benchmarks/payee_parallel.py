@@ -0,0 +1,63 @@
+"""Crossover benchmark for resolving payees in worker processes.
+
+Resolves growing numbers of distinct memos against a regex-heavy mapping,
+in-process and with a pool of workers (started fresh each time, as on a
+CLI run), and prints the smallest number of memos for which the workers
+are faster: a good value for PARALLEL_MIN_MEMOS on this machine.
+
+    python benchmarks/payee_parallel.py --payees 1000 --workers 8
+"""
+import argparse
+import os
+import time
+
+from ynabkit import payee
+
+
+def mappings(payees: int) -> list:
+    return [
+        {"name": f"Payee {i}", "patterns": [f"^SHOP {i} ", f"PAGAMENTO .* NEGOZIO {i}$", f"\\bREF{i:05d}\\b"]}
+        for i in range(payees)
+    ]
+
+
+def resolve(memos: list, payees: int, workers: int) -> float:
+    resolver = payee.PayeeResolver(workers=workers, min_parallel=0)
+    resolver.load_mappings(mappings(payees))
+
+    start = time.perf_counter()
+    try:
+        resolver.resolve_many(memos)
+    finally:
+        resolver.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payees", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-memos", type=int, default=50_000)
+    args = parser.parse_args()
+
+    crossover = None
+    memos = 100
+    while memos <= args.max_memos:
+        batch = [f"PAGAMENTO POS {i} NEGOZIO {i * 7919 % (args.payees * 2)}" for i in range(memos)]
+
+        sequential = resolve(batch, args.payees, 1)
+        parallel = resolve(batch, args.payees, args.workers)
+        print(f"{memos:>7} memos: in-process {sequential:.3f}s, {args.workers} workers {parallel:.3f}s ({sequential / parallel:.2f}x)")
+
+        if crossover is None and parallel < sequential:
+            crossover = memos
+        memos = memos * 3 if str(memos).startswith("1") else memos * 10 // 3
+
+    if crossover is None:
+        print("The workers were never faster: keep resolving in-process")
+    else:
+        print(f"The workers are faster from about {crossover} distinct memos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Speed and memory benchmark of the .xlsx engines.
+
+Writes a Fineco account statement and a Satispay export with the given
+number of rows, reads each with every engine, and prints the time taken
+and the peak memory allocated while reading.
+
+    python benchmarks/xlsx_engines.py --rows 50000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+import tracemalloc
+
+from openpyxl import Workbook
+
+from ynabkit import xlsx
+from ynabkit.fineco.inputs import AccountTransactionsInput
+from ynabkit.satispay.inputs import TransactionsInput
+
+
+def write_fineco(path: str, rows: int):
+    workbook = Workbook()
+    ws = workbook.active
+    for _ in range(10):
+        ws.append(["header"])
+    for i in range(rows):
+        day = datetime.datetime(2024, 1, i % 28 + 1)
+        ws.append([day, day, None, -12.4, "Pagamento Visa Debit", f"Negozio {i % 500}", "Contabilizzato", "Alimentari"])
+    workbook.save(path)
+
+
+def write_satispay(path: str, rows: int):
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append(["Date", "Name", "Description", "Amount", "Type", "Status", "Balance", "Balance after"])
+    for i in range(rows):
+        ws.append([f"{i % 28 + 1} Jan 2024 at 06:30:00 PM", f"Shop {i % 500}", "", "-1,20", "🏬 to a Store", "✅ Approved", None, None])
+    workbook.save(path)
+
+
+def measure(read) -> tuple:
+    start = time.perf_counter()
+    read()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        fineco = os.path.join(directory, "fineco.xlsx")
+        satispay = os.path.join(directory, "satispay.xlsx")
+        write_fineco(fineco, args.rows)
+        write_satispay(satispay, args.rows)
+
+        readers = {
+            "fineco-account": lambda engine: AccountTransactionsInput(fineco, lambda memo: "", 11, 8, engine=engine).read(),
+            "satispay": lambda engine: TransactionsInput(satispay, payee_resolver=lambda memo: "", engine=engine).read(),
+        }
+        for name, read in readers.items():
+            for engine in xlsx.ENGINES:
+                elapsed, peak = measure(lambda: read(engine))
+                print(f"{name:>14} {engine:>9}: {elapsed:.3f}s, peak {peak / 2**20:.1f} MiB ({args.rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,17 @@ setup(
     entry_points="""
         [console_scripts]
         ynabkit=ynabkit.cli:cli
+
+        [ynabkit.banks]
+        fineco=ynabkit.fineco.cli:fineco
+        n26=ynabkit.n26.cli:n26
+        satispay=ynabkit.satispay.cli:satispay
+
+        [ynabkit.sources]
+        fineco-account=ynabkit.fineco.cli:open_account
+        fineco-card=ynabkit.fineco.cli:open_card
+        n26=ynabkit.n26.cli:open_transactions
+        satispay=ynabkit.satispay.cli:open_transactions
     """,
     install_requires=[
         "click",
@@ -46,7 +57,10 @@ setup(
     extras_require={
         "test": [
             "pytest",
-        ]
+        ],
+        "zstd": [
+            "zstandard",  # Required to write .zst output files
+        ],
     },
     python_requires=">=3.10",
 )
@@ -0,0 +1,24 @@
+from ynabkit.amounts import format_milliunits, from_milliunits, to_milliunits
+
+
+def test_to_milliunits():
+    assert to_milliunits(-12.4) == -12400
+    assert to_milliunits(-12.399999999999999) == -12400
+    assert to_milliunits("1234.56") == 1234560
+    assert to_milliunits(b"-0.5") == -500
+    assert to_milliunits(40) == 40000
+
+
+def test_sums_are_exact():
+    """Test that summing milliunits does not drift like summing floats does."""
+    amounts = [-4.1, -3.2, -5.1]
+    assert sum(amounts) != -12.4
+    assert sum(to_milliunits(amount) for amount in amounts) == -12400
+
+
+def test_format_milliunits():
+    assert format_milliunits(-12400) == "-12.40"
+    assert format_milliunits(1234567) == "1234.567"
+    assert format_milliunits(-5) == "-0.005"
+    assert format_milliunits(0) == "0.00"
+    assert from_milliunits(-12400) == -12.4
@@ -0,0 +1,133 @@
+import datetime
+import os
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from openpyxl import Workbook
+
+from ynabkit.cache import RowCache
+from ynabkit.cli import cli
+from ynabkit.fineco.inputs import AccountTransactionsInput, CreditCardTransactionsInput
+
+
+def _write_fineco_account_xlsx(path, rows: int):
+    workbook = Workbook()
+    ws = workbook.active
+    # The statement header takes the first 10 rows
+    for _ in range(10):
+        ws.append(["header"])
+    for i in range(rows):
+        ws.append([
+            datetime.datetime(2024, 1, i % 28 + 1),
+            datetime.datetime(2024, 1, i % 28 + 1),
+            100.0 if i % 4 == 0 else None,
+            None if i % 4 == 0 else -12.4,
+            "Pagamento Visa Debit",
+            f"Negozio {i}",
+            "Contabilizzato",
+            None if i % 3 == 0 else "Alimentari",
+        ])
+    workbook.save(path)
+
+
+def test_round_trip(tmp_path):
+    """Test that rows come back from the cache unchanged, nulls included."""
+    cache = RowCache(str(tmp_path))
+    rows = [
+        (datetime.datetime(2024, 1, 15, 10, 30), -12.4, "Caffè ☕", None),
+        (None, None, "", "x" * 1000),
+        (datetime.datetime(1999, 12, 31), 1e6, "AMAZON", "Shopping"),
+    ]
+
+    assert cache.get("key", "tfss") is None
+    cache.put("key", "tfss", rows)
+    assert cache.get("key", "tfss") == rows
+
+    # A different layout is a miss
+    assert cache.get("key", "tfsf") is None
+
+
+def test_eviction_and_clear(tmp_path):
+    """Test that the least recently used entries are evicted over the size limit."""
+    cache = RowCache(str(tmp_path), max_size=3000)
+    rows = [("x" * 1000,)]
+
+    cache.put("a", "s", rows)
+    cache.put("b", "s", rows)
+    os.utime(tmp_path / "a.rows", (0, 0))
+    os.utime(tmp_path / "b.rows", (1, 1))
+    cache.get("a", "s")  # a is now the most recently used
+    cache.put("c", "s", rows)
+
+    assert cache.get("b", "s") is None
+    assert cache.get("a", "s") == rows
+    assert cache.get("c", "s") == rows
+
+    assert cache.clear() == 2
+    assert cache.get("a", "s") is None
+
+
+def test_fineco_account_cache(tmp_path):
+    """Test that a cached statement is not parsed again, and payees are still resolved."""
+    path = str(tmp_path / "fineco.xlsx")
+    _write_fineco_account_xlsx(path, 50)
+    cache = RowCache(str(tmp_path / "cache"))
+
+    def resolve_payee(memo):
+        return "Negozio" if memo.endswith("Negozio 1") else ""
+
+    expected = AccountTransactionsInput(path, resolve_payee, 11, 8).read()
+    assert AccountTransactionsInput(path, resolve_payee, 11, 8, cache=cache).read() == expected
+
+    with patch.object(AccountTransactionsInput, "_parse") as parse:
+        transactions = AccountTransactionsInput(path, resolve_payee, 11, 8, cache=cache).read()
+        parse.assert_not_called()
+
+    assert transactions == expected
+    assert transactions[1].payee == "Negozio"
+
+    # Different reader options use a different entry
+    with patch.object(AccountTransactionsInput, "_parse", return_value=[]) as parse:
+        AccountTransactionsInput(path, resolve_payee, 12, 8, cache=cache).read()
+        parse.assert_called_once()
+
+
+def test_fineco_card_cache(tmp_path):
+    """Test that card rows round-trip through the cache, and every circuit's memos are resolved."""
+    path = tmp_path / "card.xls"
+    path.write_bytes(b"statement")
+    cache = RowCache(str(tmp_path / "cache"))
+    rows = [
+        ("MARIO ROSSI", "****1234", datetime.datetime(2024, 1, 14), datetime.datetime(2024, 1, 15),
+         "AMAZON EU", "Contabilizzato", "Acquisto", "VISA", "Pagamento", -25000),
+        ("MARIO ROSSI", "****1234", datetime.datetime(2024, 1, 15), datetime.datetime(2024, 1, 16),
+         "BAR ROMA", "Contabilizzato", "Acquisto", "BANCOMAT", "Pagamento", -1200),
+    ]
+    resolved = []
+
+    def resolve_payee(memo):
+        resolved.append(memo)
+        return "Amazon" if memo == "AMAZON EU" else ""
+
+    with patch.object(CreditCardTransactionsInput, "_parse", return_value=rows):
+        expected = CreditCardTransactionsInput(str(path), resolve_payee, circuit="ALL").read()
+        assert CreditCardTransactionsInput(str(path), resolve_payee, circuit="ALL", cache=cache).read() == expected
+
+    with patch.object(CreditCardTransactionsInput, "_parse") as parse:
+        resolved.clear()
+        transactions = CreditCardTransactionsInput(str(path), resolve_payee, circuit="VISA", cache=cache).read()
+        parse.assert_not_called()
+
+    assert transactions == expected[:1]
+    assert transactions[0].payee == "Amazon"
+    assert resolved == ["AMAZON EU", "BAR ROMA"]
+
+
+def test_cache_clear_command_needs_no_payees(tmp_path, monkeypatch):
+    """Test that cache clear runs where there is no payees.yml."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    result = CliRunner().invoke(cli, ["cache", "clear"])
+    assert result.exit_code == 0, result.output
+    assert "Removed 0 cache entries" in result.output
@@ -0,0 +1,82 @@
+import datetime
+import json
+
+from click.testing import CliRunner
+
+from ynabkit import diff
+from ynabkit.cli import cli
+from ynabkit.fineco.models import AccountTransaction
+from ynabkit.fineco.outputs import AccountTransactionsOutput
+
+HEADER = (
+    '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+    '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+)
+
+
+def _fineco(day: int, description_full: str, amount: int, state: str = "Contabilizzato") -> AccountTransaction:
+    return AccountTransaction(
+        date=datetime.datetime(2024, 3, day),
+        amount=amount,
+        description="Pagamento Visa Debit",
+        description_full=description_full,
+        state=state,
+        moneymap_category="Alimentari",
+        payee="",
+    )
+
+
+def _pairs(transactions):
+    return list(zip(transactions, AccountTransactionsOutput().records(transactions)))
+
+
+def test_diff():
+    """Test that transactions are paired on their fingerprint, duplicates included."""
+    old = [
+        _fineco(1, "Bar Roma", -1200),
+        _fineco(1, "Bar Roma", -1200),
+        _fineco(2, "Coop", -35000, state="Autorizzato"),
+        _fineco(3, "Amazon", -9990),
+    ]
+    new = [
+        _fineco(1, "Bar Roma", -1200),
+        _fineco(2, "Coop", -35000),
+        _fineco(4, "Spotify", -9990),
+    ]
+
+    changes = list(diff.diff(_pairs(old), _pairs(new)))
+
+    assert [(c.status, c.record.memo) for c in changes] == [
+        (diff.CHANGED, "Pagamento Visa Debit: Coop"),
+        (diff.ADDED, "Pagamento Visa Debit: Spotify"),
+        (diff.REMOVED, "Pagamento Visa Debit: Bar Roma"),
+        (diff.REMOVED, "Pagamento Visa Debit: Amazon"),
+    ]
+    assert changes[0].fields == {"state": ("Autorizzato", "Contabilizzato")}
+
+
+def test_diff_command(tmp_path):
+    """Test the n26 diff command end to end, with JSON output."""
+    (tmp_path / "payees.yml").write_text("- name: Amazon\n  patterns:\n  - AMAZON\n")
+    (tmp_path / "old.csv").write_text(
+        HEADER
+        + '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        + '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+    (tmp_path / "new.csv").write_text(
+        HEADER
+        + '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        + '"2024-01-11","2024-01-11","Bar Roma","","Presentment","Caffè","Main","-1.2","-1.2","EUR","1.0"\n'
+        + '"2024-01-12","2024-01-12","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+
+    result = CliRunner().invoke(cli, [
+        "-p", str(tmp_path / "payees.yml"),
+        "n26", "diff", str(tmp_path / "old.csv"), str(tmp_path / "new.csv"),
+        "-o", "json", "-f", str(tmp_path / "changes.json"),
+    ])
+    assert result.exit_code == 0, result.output
+
+    changes = json.loads((tmp_path / "changes.json").read_text())
+    assert [(c["status"], c["date"][:10]) for c in changes] == [("changed", "2024-01-11"), ("added", "2024-01-12")]
+    assert changes[0]["changes"] == {"payment_reference": {"old": "", "new": "Caffè"}}
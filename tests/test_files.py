@@ -0,0 +1,46 @@
+import gzip
+import os
+
+import pytest
+
+from ynabkit.files import open_output
+
+
+def test_open_output_compresses_by_extension(tmp_path):
+    """Test that .gz files are compressed and plain files are not."""
+    lines = [f"{i},Bar Roma,-1.20\n" for i in range(10000)]
+
+    with open_output(str(tmp_path / "out.csv.gz")) as f:
+        f.writelines(lines)
+    with open_output(str(tmp_path / "out.csv")) as f:
+        f.writelines(lines)
+
+    with gzip.open(tmp_path / "out.csv.gz", "rt", newline="") as f:
+        assert f.read() == "".join(lines)
+    assert (tmp_path / "out.csv").read_text() == "".join(lines)
+    assert os.path.getsize(tmp_path / "out.csv.gz") < os.path.getsize(tmp_path / "out.csv") / 4
+
+
+def test_open_output_is_atomic(tmp_path):
+    """Test that a failed write leaves the previous file untouched and no temporary files."""
+    path = tmp_path / "out.json"
+    path.write_text("previous")
+
+    with pytest.raises(RuntimeError):
+        with open_output(str(path)) as f:
+            f.write("partial")
+            raise RuntimeError("boom")
+
+    assert path.read_text() == "previous"
+    assert os.listdir(tmp_path) == ["out.json"]
+
+
+def test_open_output_zstd(tmp_path):
+    """Test that a .zst path is compressed with zstd."""
+    zstandard = pytest.importorskip("zstandard")
+
+    with open_output(str(tmp_path / "out.json.zst")) as f:
+        f.write("[]\n")
+
+    with open(tmp_path / "out.json.zst", "rb") as f:
+        assert zstandard.ZstdDecompressor().stream_reader(f).read() == b"[]\n"
@@ -0,0 +1,63 @@
+import datetime
+import random
+
+from ynabkit.index import TransactionIndex
+from ynabkit.n26.models import Transaction
+
+
+def _transaction(day: int, partner_name: str, type: str, payee: str = "") -> Transaction:
+    return Transaction(
+        booking_date=datetime.datetime(2024, 3, day),
+        value_date=datetime.datetime(2024, 3, day),
+        partner_name=partner_name,
+        partner_iban="",
+        type=type,
+        payment_reference="",
+        account_name="Main Account",
+        amount_eur=-1000,
+        original_amount=-1000,
+        original_currency="EUR",
+        exchange_rate=1.0,
+        payee=payee,
+    )
+
+
+def test_filter_keeps_file_order():
+    """Test that date windows include both ends and return transactions in file order."""
+    transactions = [
+        _transaction(5, "e", "Presentment"),
+        _transaction(1, "a", "Presentment"),
+        _transaction(3, "c", "Presentment"),
+        _transaction(3, "d", "Presentment"),
+        _transaction(2, "b", "Presentment"),
+    ]
+    index = TransactionIndex(transactions)
+
+    assert index.filter() == transactions
+    assert [t.partner_name for t in index.filter(datetime.datetime(2024, 3, 2), datetime.datetime(2024, 3, 3))] == ["c", "d", "b"]
+    assert [t.partner_name for t in index.filter(start_date=datetime.datetime(2024, 3, 4))] == ["e"]
+    assert index.filter(end_date=datetime.datetime(2024, 2, 1)) == []
+
+
+def test_filter_matches_linear_scan():
+    """Test combined filters against scanning every transaction."""
+    rng = random.Random(42)
+    transactions = [
+        _transaction(rng.randint(1, 28), f"Shop {i}", rng.choice(["Presentment", "Credit Transfer"]), rng.choice(["", "Coop", "Amazon"]))
+        for i in range(500)
+    ]
+    index = TransactionIndex(transactions)
+
+    for _ in range(50):
+        start = datetime.datetime(2024, 3, rng.randint(1, 28))
+        end = start + datetime.timedelta(days=rng.randint(0, 10))
+        payee = rng.choice([None, "", "Coop", "Amazon", "Nobody"])
+        kind = rng.choice([None, "Presentment", "Credit Transfer"])
+
+        expected = [
+            t for t in transactions
+            if start <= t.timestamp <= end
+            and (payee is None or t.payee == payee)
+            and (kind is None or t.kind == kind)
+        ]
+        assert index.filter(start, end, payee=payee, kind=kind) == expected
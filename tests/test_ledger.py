@@ -0,0 +1,120 @@
+import datetime
+
+from click.testing import CliRunner
+
+from ynabkit.cli import cli
+from ynabkit.ledger import Ledger
+from ynabkit.models import Record
+
+
+def _records(payee: str = ""):
+    return [
+        Record(date=datetime.datetime(2024, 1, 10), payee=payee, memo="AMAZON EU", amount=-25000),
+        # Same transaction twice on the same day: both must be kept
+        Record(date=datetime.datetime(2024, 1, 10), payee=payee, memo="AMAZON EU", amount=-25000),
+        Record(date=datetime.datetime(2023, 12, 1), payee="", memo="Salary", amount=2500000),
+    ]
+
+
+def test_ingest_is_idempotent(tmp_path):
+    """Test that ingesting the same records twice only updates their payee."""
+    with Ledger(str(tmp_path / "ledger.db")) as store:
+        assert store.ingest("n26", _records()) == (3, 3)
+        assert store.ingest("n26", _records(payee="Amazon")) == (0, 3)
+        assert store.ingest("fineco-account", _records()) == (3, 3)
+
+        records = list(store.query(payee="Amazon"))
+        assert [(r.source, r.payee, r.amount) for r in records] == [("n26", "Amazon", -25000)] * 2
+
+
+def test_query_filters(tmp_path):
+    """Test that filters combine and use the indexes."""
+    with Ledger(str(tmp_path / "ledger.db")) as store:
+        store.ingest("n26", _records(payee="Amazon"))
+        store.ingest("satispay", _records())
+
+        records = list(store.query(
+            sources=["n26", "satispay"],
+            start_date=datetime.datetime(2024, 1, 1),
+            end_date=datetime.datetime(2024, 12, 31),
+        ))
+        assert len(records) == 4
+
+        records = list(store.query(min_amount=0))
+        assert [(r.source, r.memo) for r in records] == [("n26", "Salary"), ("satispay", "Salary")]
+
+        plan = store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE date >= ? AND date <= ?",
+            ("2024-01-01", "2024-12-31"),
+        ).fetchall()
+        assert "transactions_date" in str(plan)
+
+
+def test_ingest_and_query_commands(tmp_path):
+    """Test the ingest and query commands end to end on an N26 file."""
+    (tmp_path / "payees.yml").write_text("- name: Amazon\n  patterns:\n  - AMAZON\n")
+    (tmp_path / "n26.csv").write_text(
+        '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+        '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+        '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+    database = str(tmp_path / "ledger.db")
+    payees = str(tmp_path / "payees.yml")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["-p", payees, "ingest", "n26", str(tmp_path / "n26.csv"), "-d", database])
+    assert result.exit_code == 0, result.output
+    assert "Ingested 2 transactions" in result.output
+
+    result = runner.invoke(cli, ["-p", payees, "query", "-d", database, "--payee", "Amazon", "-o", "csv"])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip().splitlines()[1:] == ["01/10/2024,Amazon,AMAZON EU,-25.00,n26"]
+
+
+def test_refresh(tmp_path):
+    """Test that a refresh updates the payees a mappings change affects, and reports the transactions."""
+    old = [{"name": "Amazon", "patterns": ["AMAZON"]}]
+    new = [{"name": "Amazon EU", "exact": ["AMAZON EU"]}, {"name": "Employer", "patterns": ["SALARY"]}]
+
+    with Ledger(str(tmp_path / "ledger.db")) as store:
+        store.ingest("n26", _records(payee="Amazon"), old)
+        assert store.mappings("n26") == old
+        assert store.refresh("n26", old) == []
+
+        changes = store.refresh("n26", new)
+        assert [(r.date.year, r.memo, old_payee, r.payee) for r, old_payee in changes] == [
+            (2023, "Salary", "", "Employer"),
+            (2024, "AMAZON EU", "Amazon", "Amazon EU"),
+            (2024, "AMAZON EU", "Amazon", "Amazon EU"),
+        ]
+        assert store.mappings("n26") == new
+        assert [r.payee for r in store.query()] == ["Employer", "Amazon EU", "Amazon EU"]
+
+
+def test_payees_refresh_command(tmp_path):
+    """Test that payees refresh reports the transactions whose payee changed after editing payees.yml."""
+    (tmp_path / "payees.yml").write_text("- name: Amazon\n  patterns:\n  - AMAZON\n")
+    (tmp_path / "n26.csv").write_text(
+        '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+        '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+        '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+    database = str(tmp_path / "ledger.db")
+    payees = str(tmp_path / "payees.yml")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["-p", payees, "ingest", "n26", str(tmp_path / "n26.csv"), "-d", database])
+    assert result.exit_code == 0, result.output
+
+    (tmp_path / "payees.yml").write_text(
+        "- name: Amazon\n  patterns:\n  - AMAZON\n- name: Bar Roma\n  prefix:\n  - BAR ROMA\n"
+    )
+    result = runner.invoke(cli, ["-p", payees, "payees", "refresh", "-d", database, "-o", "csv"])
+    assert result.exit_code == 0, result.output
+    assert "n26: 1 transactions changed payee" in result.output
+    assert "changed,01/11/2024,Bar Roma,Bar Roma,-1.20,payee:  → Bar Roma" in result.output
+
+    result = runner.invoke(cli, ["-p", payees, "payees", "refresh", "-d", database])
+    assert "n26: 0 transactions changed payee" in result.output
@@ -0,0 +1,169 @@
+import csv
+import datetime
+import tracemalloc
+
+import pytest
+from openpyxl import Workbook
+
+from ynabkit import payee
+from ynabkit.fineco.inputs import AccountTransactionsInput
+from ynabkit.fineco.outputs import AccountTransactionsOutput
+from ynabkit.n26.inputs import MappedTransactionsInput, TransactionsInput as N26TransactionsInput
+from ynabkit.n26.outputs import TransactionsOutput as N26TransactionsOutput
+from ynabkit.satispay.inputs import TransactionsInput as SatispayTransactionsInput
+from ynabkit.satispay.outputs import TransactionsOutput as SatispayTransactionsOutput
+
+# Rows of the synthetic statements. Tables are laid out by rich, which is
+# slow, so they are measured on the first TABLE_ROWS transactions only.
+ROWS = 2000
+TABLE_ROWS = 200
+
+# Peak allocations in KiB per 10k rows, about 1.5 times what was measured
+# when the budget was recorded. Lower a budget when an optimisation lands,
+# raise it only when the extra memory is expected.
+#
+# Fineco card statements are .xls files, which can't be generated here.
+BUDGETS = {
+    ("fineco-account", "read"): 50_000,
+    ("fineco-account", "table"): 170_000,
+    ("fineco-account", "csv"): 3_600,
+    ("fineco-account", "json"): 23_000,
+    ("fineco-account", "ofx"): 100,
+    ("fineco-account-iterparse", "read"): 11_000,
+    ("n26", "read"): 10_500,
+    ("n26", "table"): 147_000,
+    ("n26", "csv"): 3_000,
+    ("n26", "json"): 37_000,
+    ("n26", "ofx"): 100,
+    ("n26-mmap", "read"): 10_000,
+    ("satispay", "read"): 46_000,
+    ("satispay", "table"): 72_000,
+    ("satispay", "csv"): 3_000,
+    ("satispay", "json"): 20_000,
+    ("satispay", "ofx"): 100,
+    ("satispay-iterparse", "read"): 10_500,
+}
+
+
+def _resolver() -> payee.PayeeResolver:
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings([
+        {"name": "Spotify", "patterns": ["SPOTIFY"]},
+        {"name": "Coop", "prefix": ["COOP"]},
+    ])
+    return resolver
+
+
+def _memo(i: int) -> str:
+    return ["SPOTIFY P0123456", f"COOP ALLEANZA {i}", f"Negozio {i}"][i % 3]
+
+
+def _write_fineco_account(path):
+    workbook = Workbook()
+    ws = workbook.active
+    for _ in range(10):
+        ws.append(["header"])
+    for i in range(ROWS):
+        day = datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i)
+        ws.append([day, day, None, -12.4 - i, "Pagamento Visa Debit", _memo(i), "Contabilizzato", "Alimentari"])
+    workbook.save(path)
+
+
+def _write_n26(path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Booking Date", "Value Date", "Partner Name", "Partner Iban", "Type", "Payment Reference",
+                         "Account Name", "Amount (EUR)", "Original Amount", "Original Currency", "Exchange Rate"])
+        for i in range(ROWS):
+            day = (datetime.date(2024, 1, 1) + datetime.timedelta(days=i // 10)).isoformat()
+            writer.writerow([day, day, _memo(i), "", "Presentment", f"Invoice {i}", "Main Account",
+                             f"-{i}.5", f"-{i}.5", "EUR", "1.0"])
+
+
+def _write_satispay(path):
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append(["Date", "Name", "Description", "Amount", "Type", "Status", "Balance", "Balance after"])
+    for i in range(ROWS):
+        day = datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i)
+        ws.append([day, _memo(i), "", -1.5 - i, "🏬 to a Store", "✅ Approved", None, None])
+    workbook.save(path)
+
+
+@pytest.fixture(scope="module")
+def statements(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("statements")
+    _write_fineco_account(directory / "fineco.xlsx")
+    _write_n26(directory / "n26.csv")
+    _write_satispay(directory / "satispay.xlsx")
+
+    return {
+        "fineco-account": (
+            lambda: AccountTransactionsInput(str(directory / "fineco.xlsx"), _resolver(), 11, 8),
+            AccountTransactionsOutput(),
+        ),
+        "fineco-account-iterparse": (
+            lambda: AccountTransactionsInput(str(directory / "fineco.xlsx"), _resolver(), 11, 8, engine="iterparse"),
+            AccountTransactionsOutput(),
+        ),
+        "n26": (
+            lambda: N26TransactionsInput(str(directory / "n26.csv"), True, _resolver()),
+            N26TransactionsOutput(),
+        ),
+        "n26-mmap": (
+            lambda: MappedTransactionsInput(str(directory / "n26.csv"), True, _resolver()),
+            N26TransactionsOutput(),
+        ),
+        "satispay": (
+            lambda: SatispayTransactionsInput(str(directory / "satispay.xlsx"), _resolver()),
+            SatispayTransactionsOutput(),
+        ),
+        "satispay-iterparse": (
+            lambda: SatispayTransactionsInput(str(directory / "satispay.xlsx"), _resolver(), engine="iterparse"),
+            SatispayTransactionsOutput(),
+        ),
+    }
+
+
+def _peak_per_10k_rows(function, rows: int) -> int:
+    """Return the peak allocations of function in KiB per 10k rows"""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak * 10_000 // rows // 1024
+
+
+def _check_budget(source: str, step: str, peak: int):
+    budget = BUDGETS[(source, step)]
+    assert peak <= budget, f"{source} {step} peaked at {peak} KiB per 10k rows, over its budget of {budget} KiB"
+
+
+@pytest.mark.parametrize("source", sorted({source for source, step in BUDGETS if step == "read"}))
+def test_reader_memory(statements, source):
+    """Test that reading a statement stays within its memory budget."""
+    open_input, _ = statements[source]
+
+    _check_budget(source, "read", _peak_per_10k_rows(lambda: open_input().read(), ROWS))
+
+
+@pytest.mark.parametrize("source, output_format", sorted(key for key in BUDGETS if key[1] != "read"))
+def test_output_memory(statements, source, output_format):
+    """Test that rendering a statement stays within its memory budget."""
+    open_input, output = statements[source]
+    transactions = open_input().read()
+    if output_format == "table":
+        transactions = transactions[:TABLE_ROWS]
+
+    def render():
+        if output_format == "ofx":
+            # Consume the chunks as a file would, without joining them
+            for _ in output.ofx(transactions):
+                pass
+        else:
+            getattr(output, output_format)(transactions)
+
+    _check_budget(source, output_format, _peak_per_10k_rows(render, len(transactions)))
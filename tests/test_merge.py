@@ -0,0 +1,83 @@
+import datetime
+
+import pytest
+from click.testing import CliRunner
+
+from ynabkit.cli import cli
+from ynabkit.merge import UnsortedSourceError, in_date_order, merge_sorted
+from ynabkit.models import Record
+
+HEADER = (
+    '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+    '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+)
+
+
+def _record(day: int, memo: str) -> Record:
+    return Record(date=datetime.datetime(2024, 1, day), payee="", memo=memo, amount=-1000)
+
+
+def _write_n26(path, rows):
+    with open(path, "w") as f:
+        f.write(HEADER)
+        for day, partner_name in rows:
+            f.write(f'"2024-01-{day:02d}","2024-01-{day:02d}","{partner_name}","","Presentment","","Main","-1.0","-1.0","EUR","1.0"\n')
+
+
+def test_merge_sorted():
+    """Test that sorted sources are merged by date, ties in source order, and tagged."""
+    merged = list(merge_sorted([
+        ("n26", iter([_record(1, "a"), _record(3, "c"), _record(5, "e")])),
+        ("satispay", iter([_record(2, "b"), _record(3, "d")])),
+    ]))
+
+    assert [r.memo for r in merged] == ["a", "b", "c", "d", "e"]
+    assert [r.source for r in merged] == ["n26", "satispay", "n26", "satispay", "n26"]
+
+
+def test_merge_sorted_rejects_unsorted_source():
+    """Test that a source going back in time is reported by name."""
+    merged = merge_sorted([("n26", iter([_record(2, "b"), _record(1, "a")]))])
+
+    with pytest.raises(UnsortedSourceError, match="n26 is not sorted"):
+        list(merged)
+
+
+def test_in_date_order():
+    """Test that a source newest first is reversed, and one in neither order is reported by name."""
+    assert [r.memo for r in in_date_order("n26", [_record(1, "a"), _record(1, "b"), _record(2, "c")])] == ["a", "b", "c"]
+    assert [r.memo for r in in_date_order("n26", [_record(3, "c"), _record(2, "b"), _record(2, "a")])] == ["a", "b", "c"]
+
+    with pytest.raises(UnsortedSourceError, match="n26 is not sorted"):
+        in_date_order("n26", [_record(1, "a"), _record(3, "c"), _record(2, "b")])
+
+
+def test_merge_command(tmp_path):
+    """Test that the merge command interleaves files, newest first ones too, and needs --sort for unsorted ones."""
+    (tmp_path / "payees.yml").write_text("- name: Amazon\n  patterns:\n  - AMAZON\n")
+    _write_n26(tmp_path / "main.csv", [(1, "AMAZON EU"), (4, "Bar Roma")])
+    _write_n26(tmp_path / "savings.csv", [(3, "Rent"), (2, "Gym")])
+    _write_n26(tmp_path / "unsorted.csv", [(2, "Gym"), (5, "Cinema"), (3, "Rent")])
+    payees = str(tmp_path / "payees.yml")
+
+    runner = CliRunner()
+    inputs = [f"n26:{tmp_path / 'main.csv'}", f"n26:{tmp_path / 'savings.csv'}"]
+    result = runner.invoke(cli, ["-p", payees, "merge", *inputs, "-o", "csv"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[1:5] == [
+        "01/01/2024,Amazon,AMAZON EU,-1.00,n26",
+        "01/02/2024,,Gym,-1.00,n26",
+        "01/03/2024,,Rent,-1.00,n26",
+        "01/04/2024,,Bar Roma,-1.00,n26",
+    ]
+
+    inputs = [f"n26:{tmp_path / 'main.csv'}", f"n26:{tmp_path / 'unsorted.csv'}"]
+    result = runner.invoke(cli, ["-p", payees, "merge", *inputs, "-o", "csv"])
+    assert result.exit_code != 0
+    assert "use --sort" in result.output
+    # Nothing is written before every file is checked
+    assert "/2024" not in result.stdout
+
+    result = runner.invoke(cli, ["-p", payees, "merge", "--sort", *inputs, "-o", "csv"])
+    assert result.exit_code == 0, result.output
+    assert [line.split(",")[2] for line in result.output.splitlines()[1:6]] == ["AMAZON EU", "Gym", "Rent", "Bar Roma", "Cinema"]
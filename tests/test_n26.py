@@ -0,0 +1,94 @@
+import csv
+
+from ynabkit import payee
+from ynabkit.n26.inputs import MappedTransactionsInput, ParallelTransactionsInput, TransactionsInput, split_records
+
+HEADER = [
+    "Booking Date", "Value Date", "Partner Name", "Partner Iban", "Type",
+    "Payment Reference", "Account Name", "Amount (EUR)", "Original Amount",
+    "Original Currency", "Exchange Rate",
+]
+
+
+def _write_csv(path, rows: int):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            writer.writerow([
+                f"2024-01-{i % 28 + 1:02d}",
+                f"2024-01-{i % 28 + 1:02d}",
+                "SPOTIFY" if i % 3 == 0 else f"Shop {i}",
+                "",
+                "Presentment",
+                # Quoted fields with newlines must not be split across chunks
+                f"Invoice {i}\nline two, with a comma" if i % 5 == 0 else "",
+                "Main Account",
+                f"-{i}.5",
+                f"-{i}.5",
+                "EUR",
+                "1.0",
+            ])
+
+
+def _resolver() -> payee.PayeeResolver:
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings([{"name": "Spotify", "patterns": ["SPOTIFY"]}])
+    return resolver
+
+
+def test_split_records(tmp_path):
+    """Test that chunks start and end on record boundaries."""
+    path = tmp_path / "n26.csv"
+    _write_csv(path, 500)
+
+    chunks = split_records(path, 7)
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == path.stat().st_size
+    assert all(end == start for (_, end), (start, _) in zip(chunks, chunks[1:]))
+
+    data = path.read_bytes()
+    rows = sum(len(list(csv.reader(data[start:end].decode().splitlines(keepends=True)))) for start, end in chunks)
+    assert rows == 501
+
+
+def test_parallel_read(tmp_path):
+    """Test that the parallel reader returns the same transactions, in the same order."""
+    path = tmp_path / "n26.csv"
+    _write_csv(path, 500)
+
+    sequential_resolver = _resolver()
+    expected = TransactionsInput(str(path), skip_header=True, payee_resolver=sequential_resolver).read()
+
+    parallel_resolver = _resolver()
+    transactions = ParallelTransactionsInput(str(path), skip_header=True, payee_resolver=parallel_resolver, workers=2).read()
+
+    assert transactions == expected
+    assert parallel_resolver.unresolved == sequential_resolver.unresolved
+
+
+def test_mapped_read(tmp_path):
+    """Test that the memory-mapped reader matches the csv module, quoted fields included."""
+    path = tmp_path / "n26.csv"
+    _write_csv(path, 200)
+    with open(path, "a", newline="") as f:
+        csv.writer(f).writerow([
+            "2024-02-01", "2024-02-01", 'The "Best" Shop', "", "Presentment",
+            '"quoted",\r\nmultiline', "Main Account", "-1.5", "-1.5", "EUR", "1.0",
+        ])
+
+    expected = TransactionsInput(str(path), skip_header=True, payee_resolver=_resolver()).read()
+    transactions = MappedTransactionsInput(str(path), skip_header=True, payee_resolver=_resolver()).read()
+    assert transactions == expected
+
+    # Columns not requested are not decoded
+    transactions = MappedTransactionsInput(
+        str(path),
+        skip_header=True,
+        payee_resolver=_resolver(),
+        fields={"booking_date", "amount_eur"},
+    ).read()
+    assert transactions[-1].partner_name == 'The "Best" Shop'
+    assert transactions[-1].amount_eur == -1500
+    assert transactions[-1].partner_iban is None
+    assert transactions[-1].payment_reference is None
@@ -0,0 +1,95 @@
+import datetime
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from ynabkit import ofx
+from ynabkit.fineco.models import CreditCardTransaction
+from ynabkit.fineco.outputs import CreditCardTransactionsOutput
+from ynabkit.models import Record
+from ynabkit.n26.models import Transaction
+from ynabkit.n26.outputs import TransactionsOutput
+
+
+def _n26_transaction(day: int, partner_name: str, amount: int) -> Transaction:
+    return Transaction(
+        booking_date=datetime.datetime(2024, 3, day),
+        value_date=datetime.datetime(2024, 3, day),
+        partner_name=partner_name,
+        partner_iban="",
+        type="Presentment",
+        payment_reference="",
+        account_name="Main Account",
+        amount_eur=amount,
+        original_amount=amount,
+        original_currency="EUR",
+        exchange_rate=1.0,
+        payee="",
+    )
+
+
+def test_ofx_statement():
+    """Test that the OFX output is well-formed and contains one STMTTRN per transaction."""
+    transactions = [
+        _n26_transaction(1, "Bar & Caffè <Roma>", -1200),
+        _n26_transaction(1, "Bar & Caffè <Roma>", -1200),
+        _n26_transaction(3, "ACME Payroll", 2500000),
+    ]
+
+    document = "".join(TransactionsOutput().ofx(transactions))
+
+    # Skip the XML declaration and the OFX processing instruction
+    root = ET.fromstring(document.split("\n", 2)[2])
+    tranlist = root.find("BANKMSGSRSV1/STMTTRNRS/STMTRS/BANKTRANLIST")
+    assert tranlist.findtext("DTSTART") == "20240301000000"
+    assert tranlist.findtext("DTEND") == "20240303000000"
+
+    entries = tranlist.findall("STMTTRN")
+    assert [e.findtext("TRNTYPE") for e in entries] == ["DEBIT", "DEBIT", "CREDIT"]
+    assert [e.findtext("TRNAMT") for e in entries] == ["-1.20", "-1.20", "2500.00"]
+    assert entries[0].findtext("MEMO") == "Bar & Caffè <Roma>"
+
+    # Identical transactions on the same day get distinct FITIDs
+    fitids = [e.findtext("FITID") for e in entries]
+    assert len(set(fitids)) == 3
+    assert fitids[1] == f"{fitids[0]}-1"
+
+
+def test_ofx_fitid_is_stable():
+    """Test that FITIDs only depend on date, amount and memo."""
+    record = Record(date=datetime.datetime(2024, 3, 1), payee="", memo="SPOTIFY", amount=-9990)
+    resolved = Record(date=datetime.datetime(2024, 3, 1), payee="Spotify", memo="SPOTIFY", amount=-9990)
+
+    assert ofx.FITIDGenerator()(record) == ofx.FITIDGenerator()(resolved)
+
+
+def test_ofx_fitid_needs_records_sorted_by_date():
+    """Test that records out of date order raise, instead of reusing FITIDs."""
+    coffee = Record(date=datetime.datetime(2024, 3, 1), payee="", memo="BAR ROMA", amount=-1200)
+    other_day = Record(date=datetime.datetime(2024, 2, 28), payee="", memo="COOP", amount=-35000)
+
+    fitids = ofx.FITIDGenerator()
+    fitids(coffee)
+    fitids(other_day)
+    with pytest.raises(ValueError, match="not sorted by date"):
+        fitids(coffee)
+
+
+def test_fineco_card_ofx_sorted_by_registration_date():
+    """Test that card transactions, listed by transaction date, are written by registration date."""
+    def card(transaction_day: int, registration_day: int, description: str) -> CreditCardTransaction:
+        return CreditCardTransaction(
+            owner="", card_number="", description=description, operation_state="", operation_type="",
+            circuit="", transaction_type="", amount=-1200, payee="",
+            transaction_date=datetime.datetime(2024, 3, transaction_day),
+            registration_date=datetime.datetime(2024, 3, registration_day),
+        )
+
+    transactions = [card(1, 4, "BAR ROMA"), card(2, 3, "COOP"), card(3, 4, "BAR ROMA")]
+    document = "".join(CreditCardTransactionsOutput().ofx(transactions))
+
+    root = ET.fromstring(document.split("\n", 2)[2])
+    entries = root.find("BANKMSGSRSV1/STMTTRNRS/STMTRS/BANKTRANLIST").findall("STMTTRN")
+    assert [e.findtext("DTPOSTED") for e in entries] == ["20240303000000", "20240304000000", "20240304000000"]
+    fitids = [e.findtext("FITID") for e in entries]
+    assert fitids[2] == f"{fitids[1]}-1"
@@ -0,0 +1,200 @@
+import yaml
+
+from ynabkit import payee
+from ynabkit.outputs import SuggestionsOutput
+
+
+def test_suggest_ranks_similar_payees():
+    """Test that memos are matched to the payee of the most similar resolved memo."""
+    suggester = payee.PayeeSuggester()
+    suggester.add("AMAZON MKTPLACE PMTS 1234", "Amazon")
+    suggester.add("AMZN Mktp IT 5678", "Amazon")
+    suggester.add("SPOTIFY P0123456", "Spotify")
+    suggester.add("COOP ALLEANZA 3.0 BOLOGNA", "Coop")
+
+    suggestions = suggester.suggest("AMAZON MKTPLACE PMTS 9999")
+    assert suggestions[0][0] == "Amazon"
+    assert suggestions[0][1] == 1.0  # digits are ignored
+
+    assert suggester.suggest("Spotify AB 42")[0][0] == "Spotify"
+    assert suggester.suggest("XYZ") == []
+
+
+def test_suggest_skips_frequent_trigrams():
+    """Test that trigrams shared by too many memos are not used to find candidates."""
+    suggester = payee.PayeeSuggester(max_postings=10)
+    for i in range(100):
+        suggester.add(f"PAGAMENTO NEGOZIO {chr(65 + i % 26)}{chr(65 + i // 26)}", f"Negozio {i}")
+    suggester.add("PAGAMENTO FARMACIA CENTRALE", "Farmacia")
+
+    assert suggester.suggest("PAGAMENTO FARMACIA CENTRALE SRL")[0][0] == "Farmacia"
+
+
+def test_suggestions_yaml():
+    """Test that the YAML snippet loads as payee mappings matching the memos."""
+    suggestions = {
+        "AMAZON* 2X3 (EU)": [("Amazon", 0.8), ("Audible", 0.4)],
+        "AMAZON PRIME": [("Amazon", 0.6)],
+        "UNKNOWN": [],
+    }
+
+    mappings = yaml.safe_load(SuggestionsOutput().yaml(suggestions))
+    assert [m["name"] for m in mappings] == ["Amazon"]
+
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings(mappings)
+    assert resolver("AMAZON* 2X3 (EU)") == "Amazon"
+    assert resolver("AMAZON PRIME") == "Amazon"
+
+
+def test_resolve_exact_and_prefix():
+    """Test that exact and prefix memos match case folded and whitespace normalised."""
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings([
+        {"name": "Bar Roma", "exact": ["Bar  Roma"]},
+        {"name": "Coop", "prefix": ["COOP", "COOP ALLEANZA 3.0 BOLOGNA"]},
+        {"name": "Coop Bologna", "prefix": ["coop alleanza"]},
+        {"name": "Spotify", "patterns": ["SPOTIFY"]},
+    ])
+
+    assert resolver("bar roma") == "Bar Roma"
+    assert resolver("Bar Roma Centro") == ""
+    assert resolver("COOP ALLEANZA 3.0   bologna 12") == "Coop"
+    assert resolver("Coopvoce") == "Coop"
+    assert resolver("CO") == ""
+    assert resolver("Spotify P0123") == "Spotify"
+    assert resolver.unresolved == {"Bar Roma Centro", "CO"}
+
+
+def test_prefix_trailing_space_matches_whole_words():
+    """Test that a prefix ending with a space keeps it, so it does not match a longer word."""
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings([{"name": "Bar Roma", "prefix": ["BAR ROMA "]}])
+
+    assert resolver("BAR ROMA SNC") == "Bar Roma"
+    assert resolver("bar  roma   centro") == "Bar Roma"
+    assert resolver("BAR ROMANO") == ""
+    assert resolver("BAR ROMA") == ""
+
+
+def test_resolve_keeps_payee_order():
+    """Test that the first payee matching wins, whichever section matches it."""
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings([
+        {"name": "Amazon", "patterns": ["^AMAZON"]},
+        {"name": "Amazon Prime", "exact": ["AMAZON PRIME"], "prefix": ["AMZN"]},
+        {"name": "Anything", "patterns": ["."]},
+        {"name": "Prime Video", "prefix": ["PRIME VIDEO"]},
+    ])
+
+    # The pattern of Amazon comes first
+    assert resolver("amazon prime") == "Amazon"
+    assert resolver("AMZN Mktp") == "Amazon Prime"
+    # The pattern of Anything comes before the prefix of Prime Video
+    assert resolver("Prime Video IT") == "Anything"
+
+
+def test_prefix_index_matches_linear_scan():
+    """Test the sorted prefix index against checking every prefix in turn."""
+    prefixes = ["a", "ab", "abc", "abd", "b", "ba", "bab", "c", "ca b"]
+    mappings = [{"name": p, "prefix": [p]} for p in reversed(prefixes)]
+    resolver = payee.PayeeResolver()
+    resolver.load_mappings(mappings)
+
+    for memo in ["", "a", "aa", "abcd", "abd", "abe", "b", "bac", "babz", "bz", "ca", "ca bc", "d"]:
+        expected = next((m["name"] for m in mappings if memo.startswith(m["prefix"][0])), "")
+        assert resolver(memo) == expected, memo
+
+
+def test_resolve_many_in_worker_processes():
+    """Test that memos resolved by the workers match the in-process results, unresolved memos included."""
+    mappings = [
+        {"name": "Spotify", "patterns": ["SPOTIFY"]},
+        {"name": "Coop", "prefix": ["COOP"]},
+        {"name": "Bar Roma", "exact": ["BAR ROMA"]},
+    ]
+    memos = ["SPOTIFY P0123", "COOP ALLEANZA", "bar roma", "Negozio 1", "SPOTIFY P0123", "Negozio 2"] * 10
+
+    expected = payee.PayeeResolver()
+    expected.load_mappings(mappings)
+
+    resolver = payee.PayeeResolver(workers=2, min_parallel=1)
+    resolver.load_mappings(mappings)
+    try:
+        assert resolver.resolve_many(memos) == [expected(memo) for memo in memos]
+        assert resolver._pool is not None
+    finally:
+        resolver.close()
+
+    assert resolver.unresolved == expected.unresolved == {"Negozio 1", "Negozio 2"}
+
+
+def test_resolve_many_falls_back_in_process():
+    """Test that few distinct memos are resolved without starting worker processes."""
+    resolver = payee.PayeeResolver(workers=4, min_parallel=100)
+    resolver.load_mappings([{"name": "Spotify", "patterns": ["SPOTIFY"]}])
+
+    assert resolver.resolve_many(["SPOTIFY", "Bar"] * 500) == ["Spotify", ""] * 500
+    assert resolver._pool is None
+    assert resolver.unresolved == {"Bar"}
+
+
+OLD_MAPPINGS = [
+    {"name": "Amazon", "patterns": ["AMAZON"]},
+    {"name": "Bar Roma", "exact": ["BAR ROMA"]},
+    {"name": "Coop", "prefix": ["COOP"]},
+]
+
+
+def test_changed_payees():
+    """Test that added, removed and edited payees are found, and reordering changes everything."""
+    new = [
+        {"name": "Amazon Prime", "patterns": ["AMAZON PRIME"]},
+        OLD_MAPPINGS[0],
+        OLD_MAPPINGS[1],
+        {"name": "Coop", "prefix": ["COOP ALLEANZA"]},
+    ]
+    assert payee.changed_payees(OLD_MAPPINGS, new) == {"Amazon Prime", "Coop"}
+    assert payee.changed_payees(OLD_MAPPINGS, OLD_MAPPINGS[1:]) == {"Amazon"}
+    assert payee.changed_payees(OLD_MAPPINGS, [OLD_MAPPINGS[1], OLD_MAPPINGS[0], OLD_MAPPINGS[2]]) is None
+
+
+def test_reresolve_only_affected_memos(monkeypatch):
+    """Test that only the memos a change could affect are resolved again."""
+    resolved = []
+    resolve_many = payee.PayeeResolver.resolve_many
+
+    def spy(self, memos):
+        resolved.extend(memos)
+        return resolve_many(self, memos)
+
+    monkeypatch.setattr(payee.PayeeResolver, "resolve_many", spy)
+
+    new = [
+        {"name": "Amazon Prime", "patterns": ["AMAZON PRIME"]},
+        OLD_MAPPINGS[0],
+        OLD_MAPPINGS[1],
+        {"name": "Coop", "prefix": ["COOP ALLEANZA"]},
+        {"name": "Conad", "exact": ["CONAD CITY"]},
+    ]
+    resolutions = {
+        "AMAZON PRIME VIDEO": "Amazon",
+        "AMAZON EU": "Amazon",
+        "BAR ROMA": "Bar Roma",
+        "COOP CENTRO": "Coop",
+        "COOP ALLEANZA 3": "Coop",
+        "CONAD CITY": "",
+        "SPOTIFY": "",
+    }
+
+    assert payee.reresolve(resolutions, OLD_MAPPINGS, new) == {
+        "AMAZON PRIME VIDEO": "Amazon Prime",
+        "COOP CENTRO": "",
+        "CONAD CITY": "Conad",
+    }
+    assert sorted(resolved) == ["AMAZON PRIME VIDEO", "CONAD CITY", "COOP ALLEANZA 3", "COOP CENTRO"]
+
+    # Without the old mappings every memo is resolved again
+    resolved.clear()
+    assert payee.reresolve(resolutions, None, new)["CONAD CITY"] == "Conad"
+    assert sorted(resolved) == sorted(resolutions)
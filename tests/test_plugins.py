@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import click
+from click.testing import CliRunner
+
+from ynabkit import plugins
+from ynabkit.cli import cli
+
+
+@click.group()
+def acme():
+    "ACME Bank related commands"
+
+
+@acme.command(name="hello")
+def acme_hello():
+    click.echo("Hello from ACME")
+
+
+def test_banks_are_imported_lazily():
+    """Test that importing the CLI imports no bank plugin, nor the spreadsheet readers."""
+    code = (
+        "import sys, ynabkit.cli; "
+        "print(sorted(m for m in sys.modules if m.split('.')[-1] in ('fineco', 'n26', 'satispay', 'openpyxl', 'xlrd')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_installed_plugin(tmp_path, monkeypatch):
+    """Test that a bank declared through an entry point becomes a subcommand."""
+    installed = [EntryPoint(name="acme", value="test_plugins:acme", group=plugins.BANKS)]
+    monkeypatch.setattr(plugins, "entry_points", lambda group: installed if group == plugins.BANKS else [])
+    plugins.registered.cache_clear()
+    (tmp_path / "payees.yml").write_text("[]\n")
+
+    try:
+        result = CliRunner().invoke(cli, ["-p", str(tmp_path / "payees.yml"), "acme", "hello"])
+        assert result.exit_code == 0, result.output
+        assert result.output == "Hello from ACME\n"
+        assert plugins.names(plugins.BANKS) == ["acme", "fineco", "n26", "satispay"]
+    finally:
+        plugins.registered.cache_clear()
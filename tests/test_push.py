@@ -0,0 +1,149 @@
+import datetime
+
+import pytest
+from click.testing import CliRunner
+
+from ynabkit import ynab
+from ynabkit.cli import cli, push
+from ynabkit.models import Record
+from ynabkit.payee import PayeeResolver
+from ynabkit.stub import StubServer
+
+HEADER = (
+    '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+    '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+)
+
+
+def _payloads(count: int):
+    records = [
+        Record(date=datetime.datetime(2024, 1, i % 28 + 1), payee="Bar Roma", memo=f"BAR ROMA {i}", amount=-1200)
+        for i in range(count)
+    ]
+    return [
+        ynab.transaction_payload(record, "account", import_id)
+        for record, import_id in zip(records, ynab.import_ids(records))
+    ]
+
+
+def test_import_ids():
+    """Test that import ids count the records with the same amount on the same day."""
+    day = datetime.datetime(2024, 1, 15)
+    records = [
+        Record(date=day, payee="", memo="BAR ROMA", amount=-1200),
+        Record(date=day, payee="", memo="BAR ROMA", amount=-1200),
+        Record(date=day, payee="", memo="COOP", amount=-35000),
+        Record(date=day + datetime.timedelta(days=1), payee="", memo="BAR ROMA", amount=-1200),
+    ]
+
+    assert list(ynab.import_ids(records)) == [
+        "YNAB:-1200:2024-01-15:1",
+        "YNAB:-1200:2024-01-15:2",
+        "YNAB:-35000:2024-01-15:1",
+        "YNAB:-1200:2024-01-16:1",
+    ]
+
+
+def test_client_batches_over_pooled_connections():
+    """Test that transactions go in bounded batches, over at most one connection per concurrent request."""
+    with StubServer() as server:
+        with ynab.Client("token", server.url, batch_size=10, concurrency=2) as client:
+            result = client.create_transactions("budget", _payloads(95))
+
+        assert result == ynab.PushResult(created=95, duplicates=0, batches=10)
+        assert max(len(r["body"]["transactions"]) for r in server.requests) == 10
+        assert len(server.connections) <= 2
+        assert server.requests[0]["path"] == "/v1/budgets/budget/transactions"
+        assert server.requests[0]["headers"]["Authorization"] == "Bearer token"
+
+
+def test_client_retries():
+    """Test that rate limited and failed requests are retried, and pushing again creates no duplicates."""
+    with StubServer(failures=[429, 503]) as server:
+        with ynab.Client("token", server.url, backoff=0) as client:
+            assert client.create_transactions("budget", _payloads(5)).created == 5
+            assert client.create_transactions("budget", _payloads(5)) == ynab.PushResult(duplicates=5, batches=1)
+
+        assert len(server.requests) == 4
+
+
+def test_client_gives_up():
+    """Test that errors which are not worth retrying, or keep happening, are raised."""
+    with StubServer(failures=[400]) as server:
+        with ynab.Client("token", server.url, backoff=0) as client:
+            with pytest.raises(ynab.YNABError) as e:
+                client.create_transactions("budget", _payloads(5))
+        assert e.value.status == 400
+        assert len(server.requests) == 1
+
+    with StubServer(failures=[500] * 3) as server:
+        with ynab.Client("token", server.url, retries=2, backoff=0) as client:
+            with pytest.raises(ynab.YNABError):
+                client.create_transactions("budget", _payloads(5))
+        assert len(server.requests) == 3
+
+
+def test_push_command(tmp_path):
+    """Test the n26 push command end to end against the stub server."""
+    (tmp_path / "payees.yml").write_text("- name: Amazon\n  patterns:\n  - AMAZON\n")
+    (tmp_path / "n26.csv").write_text(
+        HEADER
+        + '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        + '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+
+    with StubServer() as server:
+        args = [
+            "-p", str(tmp_path / "payees.yml"),
+            "n26", "push", str(tmp_path / "n26.csv"),
+            "--budget-id", "budget", "--account-id", "account", "--token", "token", "--api-url", server.url,
+        ]
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "2 created, 0 already in YNAB" in result.output
+
+        result = CliRunner().invoke(cli, args)
+        assert "0 created, 2 already in YNAB" in result.output
+
+    assert server.transactions["YNAB:-25000:2024-01-10:1"]["payee_name"] == "Amazon"
+    assert server.transactions["YNAB:-1200:2024-01-11:1"]["payee_name"] is None
+
+
+def test_push_dry_run_needs_no_budget(tmp_path, monkeypatch):
+    """Test that a dry run previews the payload without a budget id, and the date filter uses the pushed date."""
+    monkeypatch.delenv("YNAB_BUDGET_ID", raising=False)
+    (tmp_path / "payees.yml").write_text("[]")
+    (tmp_path / "n26.csv").write_text(
+        HEADER
+        + '"2024-01-10","2024-01-10","AMAZON EU","","Presentment","","Main","-25.0","-25.0","EUR","1.0"\n'
+        + '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+    args = ["n26", "push", str(tmp_path / "n26.csv"), "--account-id", "account"]
+
+    result = CliRunner().invoke(cli, ["-p", str(tmp_path / "payees.yml"), "-s", "2024-01-11", *args, "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert '"date": "2024-01-11"' in result.output
+    assert "2024-01-10" not in result.output
+
+    result = CliRunner().invoke(cli, ["-p", str(tmp_path / "payees.yml"), *args, "--token", "token"])
+    assert result.exit_code != 0
+    assert "Missing --budget-id" in result.output
+
+
+def test_push_filters_on_the_pushed_date(capsys):
+    """Test that the date filter uses the record date, e.g. the registration date of a card transaction."""
+    class Transaction:
+        # Bought on the 9th, registered on the 11th
+        timestamp = datetime.datetime(2024, 1, 9)
+
+    class Input:
+        def read(self):
+            return [Transaction()]
+
+    class Output:
+        def records(self, transactions):
+            return [Record(date=datetime.datetime(2024, 1, 11), payee="", memo="AMAZON EU", amount=-25000)]
+
+    push(Input(), Output(), PayeeResolver(), None, "account", None, ynab.API_URL, ynab.BATCH_SIZE, ynab.CONCURRENCY,
+         dry_run=True, start_date=datetime.datetime(2024, 1, 10))
+    assert '"date": "2024-01-11"' in capsys.readouterr().out
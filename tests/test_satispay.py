@@ -0,0 +1,67 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+from openpyxl import Workbook
+
+from ynabkit.satispay.inputs import AMOUNT_FORMATS, DATE_FORMATS, FormatSniffer, TransactionsInput
+
+
+def _write_satispay_xlsx(path, rows):
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append(["Date", "Name", "Description", "Amount", "Type", "Status", "Balance", "Balance after"])
+    for date, name, amount in rows:
+        ws.append([date, name, "", amount, "🏬 to a Store", "✅ Approved", None, None])
+    workbook.save(path)
+
+
+def test_amount_sniffing():
+    """Test that the amount format is detected from a sample and re-detected on a miss."""
+    parse = FormatSniffer(AMOUNT_FORMATS)
+
+    parse.detect(["-1,234.56", "+40"])
+    assert parse("-1,234.56") == -1234560
+    assert parse("+40") == 40000
+    # "1.234" fits both formats: the detected one wins
+    assert parse("1.234") == 1234
+
+    # A value that only fits the other format switches the format
+    assert parse("-12,4") == -12400
+    assert parse("1.234") == 1234000
+
+    with pytest.raises(ValueError):
+        parse("twelve")
+
+
+def test_date_sniffing_parses_once():
+    """Test that once the format is locked in, each value costs a single parse."""
+    parse = FormatSniffer(DATE_FORMATS)
+    parse.detect(["15 Jan 2024 at 18:30:00"])
+    assert parse.format is DATE_FORMATS[1]
+
+    with patch("ynabkit.satispay.inputs.FormatSniffer._parses") as parses:
+        assert parse("16 Jan 2024 at 09:05:00") == datetime.datetime(2024, 1, 16, 9, 5)
+        parses.assert_not_called()
+
+    assert parse("17 Jan 2024 at 06:30:00 PM") == datetime.datetime(2024, 1, 17, 18, 30)
+    assert parse.format is DATE_FORMATS[0]
+
+
+def test_read_parses_string_cells(tmp_path):
+    """Test that dates and amounts exported as strings are parsed."""
+    path = str(tmp_path / "satispay.xlsx")
+    _write_satispay_xlsx(path, [
+        ("15 Jan 2024 at 06:30:00 PM", "Bar Roma", "-1,20"),
+        ("16 Jan 2024 at 07:00:00 AM", "Coop", "-1.234,56"),
+        (datetime.datetime(2024, 1, 17, 12, 0), "Coop", -3.5),
+    ])
+
+    transactions = TransactionsInput(path, payee_resolver=lambda memo: "").read()
+
+    assert [t.date for t in transactions] == [
+        datetime.datetime(2024, 1, 15, 18, 30),
+        datetime.datetime(2024, 1, 16, 7, 0),
+        datetime.datetime(2024, 1, 17, 12, 0),
+    ]
+    assert [t.amount for t in transactions] == [-1200, -1234560, -3500]
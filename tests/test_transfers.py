@@ -0,0 +1,74 @@
+import datetime
+
+from click.testing import CliRunner
+from openpyxl import Workbook
+
+from ynabkit.cli import cli
+from ynabkit.models import Record
+from ynabkit.transfers import mark_transfers, match_transfers
+
+
+def _record(day: int, amount: int, source: str) -> Record:
+    return Record(date=datetime.datetime(2024, 1, day, 18, 30), payee="", memo=f"{source} {day}", amount=amount, source=source)
+
+
+def test_match_transfers():
+    """Test that opposite amounts from different sources pair within the window, each inflow once."""
+    records = [
+        _record(10, -50000, "n26"),
+        _record(10, -50000, "n26"),
+        _record(11, 50000, "satispay"),
+        _record(12, 50000, "fineco-account"),
+        # Too late for the window
+        _record(20, -50000, "n26"),
+        _record(23, 50000, "satispay"),
+        # Same source: a refund, not a transfer
+        _record(5, -12000, "n26"),
+        _record(5, 12000, "n26"),
+        # Different amount
+        _record(6, -1000, "n26"),
+        _record(6, 1200, "satispay"),
+    ]
+
+    assert match_transfers(records, window_days=2) == [(0, 2), (1, 3)]
+    assert match_transfers(records, window_days=3) == [(0, 2), (1, 3), (4, 5)]
+    assert match_transfers(records, window_days=0) == []
+
+
+def test_mark_transfers():
+    """Test that both sides of a transfer get the YNAB transfer payee of the other account."""
+    records = mark_transfers(
+        [_record(10, -50000, "n26"), _record(11, 50000, "satispay"), _record(11, -1000, "satispay")],
+        accounts={"n26": "N26 Main"},
+    )
+
+    assert [r.payee for r in records] == ["Transfer : satispay", "Transfer : N26 Main", ""]
+
+
+def test_merge_transfers_command(tmp_path):
+    """Test that merge --transfers writes transfer payees in the CSV output."""
+    (tmp_path / "payees.yml").write_text("[]")
+    (tmp_path / "n26.csv").write_text(
+        '"Booking Date","Value Date","Partner Name","Partner Iban","Type","Payment Reference",'
+        '"Account Name","Amount (EUR)","Original Amount","Original Currency","Exchange Rate"\n'
+        '"2024-01-10","2024-01-10","Satispay Europe","","Outgoing Transfer","","Main","-50.0","-50.0","EUR","1.0"\n'
+        '"2024-01-11","2024-01-11","Bar Roma","","Presentment","","Main","-1.2","-1.2","EUR","1.0"\n'
+    )
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append(["Date", "Name", "Description", "Amount", "Type", "Status", "Balance", "Balance after"])
+    ws.append([datetime.datetime(2024, 1, 11, 9, 0), "Bank", "", 50.0, "🏦 From Bank", "✅ Approved", None, None])
+    workbook.save(tmp_path / "satispay.xlsx")
+
+    result = CliRunner().invoke(cli, [
+        "-p", str(tmp_path / "payees.yml"),
+        "merge", "--transfers", "--account-name", "n26=N26 Main",
+        f"n26:{tmp_path / 'n26.csv'}", f"satispay:{tmp_path / 'satispay.xlsx'}",
+        "-o", "csv",
+    ])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[1:4] == [
+        "01/10/2024,Transfer : satispay,Satispay Europe,-50.00,n26",
+        "01/11/2024,,Bar Roma,-1.20,n26",
+        "01/11/2024,Transfer : N26 Main,Bank,50.00,satispay",
+    ]
@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from ynabkit import xlsx
+from ynabkit.fineco.inputs import AccountTransactionsInput
+from ynabkit.satispay.inputs import TransactionsInput
+
+
+def _write_xlsx(path, rows, epoch=None):
+    workbook = Workbook()
+    if epoch:
+        workbook.epoch = epoch
+    ws = workbook.active
+    for row in rows:
+        ws.append(row)
+    workbook.save(path)
+
+
+ROWS = [
+    ["Date", "Name", "Amount", "Flag"],
+    [datetime.datetime(2024, 1, 15, 18, 30), "Caffè ☕", -1.2, True],
+    [datetime.datetime(2024, 2, 29), "Coop", 35, False],
+    [],
+    ["15 Jan 2024 at 06:30:00 PM", None, "-1.234,56", None],
+    [None, "Bar Roma", 1e-7, datetime.time(8, 15, 30)],
+]
+
+
+@pytest.mark.parametrize("epoch", [None, CALENDAR_MAC_1904])
+def test_engines_read_the_same_values(tmp_path, epoch):
+    """Test that the iterparse engine reads the same values as openpyxl, empty rows and cells included."""
+    path = str(tmp_path / "values.xlsx")
+    _write_xlsx(path, ROWS, epoch)
+
+    for min_row, max_col in ((1, 4), (2, 3), (3, 6)):
+        expected = list(xlsx.read_rows(path, min_row, max_col, engine="openpyxl"))
+        assert list(xlsx.read_rows(path, min_row, max_col, engine="iterparse")) == expected
+
+
+def test_custom_date_format(tmp_path):
+    """Test that numbers with a custom date format are read as datetimes, and other formats as numbers."""
+    path = str(tmp_path / "formats.xlsx")
+    workbook = Workbook()
+    ws = workbook.active
+    ws.append([datetime.datetime(2024, 1, 15), 1234.5, 0.25])
+    ws["A1"].number_format = "dd/mm/yyyy"
+    ws["B1"].number_format = '#,##0.00 "EUR"'
+    ws["C1"].number_format = "0.00%"
+    workbook.save(path)
+
+    assert list(xlsx.iter_rows(path)) == [(datetime.datetime(2024, 1, 15), 1234.5, 0.25)]
+
+
+def test_unknown_engine(tmp_path):
+    """Test that an unknown engine is refused."""
+    with pytest.raises(ValueError):
+        xlsx.read_rows(str(tmp_path / "values.xlsx"), engine="pandas")
+
+
+def test_readers_engines(tmp_path):
+    """Test that the Fineco account and Satispay readers give the same transactions with either engine."""
+    fineco = str(tmp_path / "fineco.xlsx")
+    _write_xlsx(fineco, [["header"]] * 10 + [
+        [datetime.datetime(2024, 1, 15), datetime.datetime(2024, 1, 15), None, -12.4, "Pagamento Visa Debit", "Negozio 1", "Contabilizzato", "Alimentari"],
+        ["-", None, None, -5, "Pagamento Visa Debit", "Negozio 2", "Autorizzato", None],
+        [datetime.datetime(2024, 1, 16), datetime.datetime(2024, 1, 16), 100, None, "Bonifico", "Stipendio", "Contabilizzato", None],
+    ])
+    satispay = str(tmp_path / "satispay.xlsx")
+    _write_xlsx(satispay, [
+        ["Date", "Name", "Description", "Amount", "Type", "Status", "Balance", "Balance after"],
+        ["15 Jan 2024 at 06:30:00 PM", "Bar Roma", "", "-1,20", "🏬 to a Store", "✅ Approved", None, None],
+        [datetime.datetime(2024, 1, 17, 12, 0), "Coop", "", -3.5, "🏬 to a Store", "✅ Approved", None, None],
+    ])
+
+    def read(engine):
+        return (
+            AccountTransactionsInput(fineco, lambda memo: "", 11, 8, engine=engine).read(),
+            TransactionsInput(satispay, payee_resolver=lambda memo: "", engine=engine).read(),
+        )
+
+    accounts, transactions = read("iterparse")
+    assert (accounts, transactions) == read("openpyxl")
+    assert [t.amount for t in accounts] == [-12400, 100000]
+    assert [t.amount for t in transactions] == [-1200, -3500]
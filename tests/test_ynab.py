@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch
 import datetime
 from ynabkit.cli import cli, describe
 from ynabkit.fineco.models import AccountTransaction
+from ynabkit.fineco.outputs import AccountTransactionsOutput
 from ynabkit import payee
 
 
@@ -21,7 +22,7 @@ def test_describe_date_filtering():
     transactions = [
         AccountTransaction(
             date=datetime.datetime(2023, 1, 15),
-            amount=100.0,
+            amount=100000,
             description="Transaction 1",
             description_full="Transaction 1 Full",
             state="completed",
@@ -30,7 +31,7 @@ def test_describe_date_filtering():
         ),
         AccountTransaction(
             date=datetime.datetime(2023, 2, 15),
-            amount=200.0,
+            amount=200000,
             description="Transaction 2", 
             description_full="Transaction 2 Full",
             state="completed",
@@ -39,7 +40,7 @@ def test_describe_date_filtering():
         ),
         AccountTransaction(
             date=datetime.datetime(2023, 3, 15),
-            amount=300.0,
+            amount=300000,
             description="Transaction 3",
             description_full="Transaction 3 Full", 
             state="completed",
@@ -112,3 +113,50 @@ def test_describe_date_filtering():
         describe(mock_input, mock_output, mock_payee_resolver, "table", start_date, end_date)
         filtered_transactions = mock_output.table.call_args[0][0]
         assert len(filtered_transactions) == 0
+
+
+def test_describe_multiple_outputs(tmp_path):
+    """Test that describe reads the input once and writes every requested output."""
+    transactions = [
+        AccountTransaction(
+            date=datetime.datetime(2023, 1, 15),
+            amount=-12400,
+            description="Pagamento",
+            description_full="Bar Roma",
+            state="completed",
+            moneymap_category="category1",
+            payee="Bar"
+        ),
+    ]
+
+    mock_input = Mock()
+    mock_input.read.return_value = transactions
+
+    mock_payee_resolver = Mock(spec=payee.PayeeResolver)
+    mock_payee_resolver.unresolved = []
+
+    csv_path = tmp_path / "ynab.csv"
+    json_path = tmp_path / "archive.json"
+    describe(
+        mock_input,
+        AccountTransactionsOutput(),
+        mock_payee_resolver,
+        "table",
+        outputs=[("csv", str(csv_path)), ("json", str(json_path))],
+    )
+
+    mock_input.read.assert_called_once()
+    assert csv_path.read_text().splitlines()[1] == "01/15/2023,Bar,Pagamento: Bar Roma,-12.40"
+    assert '"amount": -12.4' in json_path.read_text()
+
+
+def test_output_option_validation(tmp_path):
+    """Test that --output rejects values not in the FORMAT:PATH form."""
+    (tmp_path / "payees.yml").write_text("[]\n")
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        "-p", str(tmp_path / "payees.yml"),
+        "n26", "describe-transactions", "missing.csv", "--output", "xml:out.xml",
+    ])
+    assert result.exit_code == 2
+    assert "'xml' is not one of" in result.output
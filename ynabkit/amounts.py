@@ -0,0 +1,30 @@
+"""Amounts are integer milliunits (YNAB's native unit: 1.23 EUR is 1230).
+
+Readers convert amounts to milliunits as soon as they parse them, so
+storage and sums are exact; outputs convert them back only when they
+render them.
+"""
+from typing import Union
+
+
+def to_milliunits(value: Union[int, float, str, bytes]) -> int:
+    """Convert an amount in currency units to milliunits ("-12.4" -> -12400)"""
+    if isinstance(value, int):
+        return value * 1000
+    # A float holds any realistic amount with an error far below half a
+    # milliunit, so rounding gives the exact result.
+    return round(float(value) * 1000)
+
+
+def from_milliunits(value: int) -> float:
+    """Convert milliunits to currency units (-12400 -> -12.4)"""
+    return value / 1000
+
+
+def format_milliunits(value: int) -> str:
+    """Format milliunits as a decimal amount with two or three decimals (-12400 -> "-12.40")"""
+    sign = "-" if value < 0 else ""
+    units, thousandths = divmod(abs(value), 1000)
+    if thousandths % 10:
+        return f"{sign}{units}.{thousandths:03d}"
+    return f"{sign}{units}.{thousandths // 10:02d}"
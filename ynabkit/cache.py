@@ -0,0 +1,214 @@
+import array
+import datetime
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Bump when the file layout changes: old entries become misses.
+FORMAT_VERSION = 1
+
+MAGIC = b"YNKC"
+SUFFIX = ".rows"
+HEADER = struct.Struct("<4sBHI")  # magic, version, columns, rows
+
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class RowCache:
+    """Cache of parsed statement rows, keyed by the input file content and the reader options.
+
+    Rows are stored column by column in a compact binary file: every
+    column has a null bitmap followed by its values, packed according to
+    its type code:
+
+        "s": str, as offsets into a UTF-8 blob
+        "i": int, as 8-byte integers (e.g. amounts in milliunits)
+        "f": float, as 8-byte doubles
+        "t": datetime, as microseconds since the epoch
+
+    Loading a file is a handful of array.frombytes() calls, far cheaper
+    than parsing the original workbook again. When the cache grows over
+    `max_size` bytes, the least recently used files are evicted.
+    """
+
+    def __init__(self, directory: str = None, max_size: int = 256 * 1024 * 1024):
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+
+    def key(self, file_name: str, **options: Any) -> str:
+        """Return the cache key for a file read with the given reader options"""
+        digest = hashlib.sha256()
+        with open(file_name, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+        digest.update(json.dumps(
+            dict(options, format_version=FORMAT_VERSION, byteorder=sys.byteorder),
+            sort_keys=True,
+        ).encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def load(self, key: str, columns: str, parse: Callable[[], List[Tuple]]) -> List[Tuple]:
+        """Return the rows cached under key, or parse and cache them"""
+        rows = self.get(key, columns)
+        if rows is None:
+            rows = parse()
+            self.put(key, columns, rows)
+        return rows
+
+    def get(self, key: str, columns: str) -> Optional[List[Tuple]]:
+        """Return the rows cached under key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            rows = _decode(data, columns)
+        except (ValueError, IndexError):
+            # Corrupted or stale entry: drop it
+            os.remove(path)
+            return None
+
+        # Mark the entry as recently used for the eviction
+        os.utime(path)
+
+        return rows
+
+    def put(self, key: str, columns: str, rows: Sequence[Tuple]):
+        """Store rows under key, evicting old entries if the cache gets too big"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_encode(rows, columns))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def clear(self) -> int:
+        """Remove every entry from the cache, returning the number of entries removed"""
+        entries = self._entries()
+        for path, _, _ in entries:
+            os.remove(path)
+        return len(entries)
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((os.path.join(self.directory, name), stat.st_mtime, stat.st_size))
+        return entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+
+def default_directory() -> str:
+    """Return the directory of the cache, following the XDG base directory spec"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ynabkit")
+
+
+def _encode(rows: Sequence[Tuple], columns: str) -> bytes:
+    count = len(rows)
+    chunks = [HEADER.pack(MAGIC, FORMAT_VERSION, len(columns), count), columns.encode("ascii")]
+
+    for index, kind in enumerate(columns):
+        values = [row[index] for row in rows]
+
+        nulls = bytearray((count + 7) // 8)
+        for position, value in enumerate(values):
+            if value is None:
+                nulls[position >> 3] |= 1 << (position & 7)
+        chunks.append(bytes(nulls))
+
+        if kind == "s":
+            blob = bytearray()
+            offsets = array.array("I", [0])
+            for value in values:
+                if value is not None:
+                    blob += (value if isinstance(value, str) else str(value)).encode("utf-8")
+                offsets.append(len(blob))
+            chunks.append(offsets.tobytes())
+            chunks.append(bytes(blob))
+        elif kind == "i":
+            chunks.append(array.array("q", [0 if value is None else value for value in values]).tobytes())
+        elif kind == "f":
+            chunks.append(array.array("d", [0.0 if value is None else float(value) for value in values]).tobytes())
+        elif kind == "t":
+            chunks.append(array.array("q", [0 if value is None else (value - EPOCH) // MICROSECOND for value in values]).tobytes())
+        else:
+            raise ValueError(f"Unknown column type {kind!r}")
+
+    return b"".join(chunks)
+
+
+def _decode(data: bytes, columns: str) -> List[Tuple]:
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated cache entry")
+
+    magic, version, column_count, count = HEADER.unpack_from(data)
+    position = HEADER.size
+    if magic != MAGIC or version != FORMAT_VERSION or data[position:position + column_count] != columns.encode("ascii"):
+        raise ValueError("Incompatible cache entry")
+    position += column_count
+
+    view = memoryview(data)
+    decoded = []
+    for kind in columns:
+        nulls = view[position:position + (count + 7) // 8]
+        position += len(nulls)
+
+        if kind == "s":
+            offsets = array.array("I")
+            offsets.frombytes(view[position:position + (count + 1) * offsets.itemsize])
+            position += (count + 1) * offsets.itemsize
+            blob = bytes(view[position:position + offsets[-1]])
+            position += offsets[-1]
+            values = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+        elif kind in ("i", "f", "t"):
+            values = array.array("d" if kind == "f" else "q")
+            values.frombytes(view[position:position + count * values.itemsize])
+            position += count * values.itemsize
+            values = values.tolist()
+            if kind == "t":
+                values = [EPOCH + value * MICROSECOND for value in values]
+        else:
+            raise ValueError(f"Unknown column type {kind!r}")
+
+        for i in range(count):
+            if nulls[i >> 3] & (1 << (i & 7)):
+                values[i] = None
+
+        decoded.append(values)
+
+    if position != len(data):
+        raise ValueError("Truncated cache entry")
+
+    return list(zip(*decoded)) if decoded and count else []
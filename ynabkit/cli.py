@@ -1,24 +1,171 @@
+import json
+import os
 import sys
 import yaml
 import datetime
 import click
+from typing import Iterable, Iterator
 
-from .fineco.inputs import AccountTransactionsInput, CreditCardTransactionsInput
-from .fineco.outputs import CreditCardTransactionsOutput, AccountTransactionsOutput
-from .satispay.inputs import TransactionsInput
-from .satispay.outputs import TransactionsOutput
-from .n26.inputs import TransactionsInput as N26TransactionsInput
-from .n26.outputs import TransactionsOutput as N26TransactionsOutput
-from . import payee
+from . import diff, files, ledger, payee, plugins, transfers, xlsx, ynab
+from .models import Record
+from .merge import UnsortedSourceError, in_date_order, merge_sorted
+from .amounts import to_milliunits
+from .cache import RowCache
+from .index import TransactionIndex
+from .outputs import ChangesOutput, RecordsOutput, SuggestionsOutput
 
 
-@click.group()
+class OutputSpec(click.ParamType):
+    """A FORMAT:PATH pair, where PATH "-" is the standard output"""
+
+    name = "format:path"
+
+    def __init__(self, formats: list):
+        self.formats = formats
+
+    def convert(self, value, param, ctx):
+        output_format, separator, path = value.partition(":")
+        if not separator or not path:
+            self.fail(f"{value!r} is not in the FORMAT:PATH form", param, ctx)
+        if output_format not in self.formats:
+            self.fail(f"{output_format!r} is not one of {', '.join(self.formats)}", param, ctx)
+        return output_format, path
+
+
+class SourceSpec(click.ParamType):
+    """A SOURCE:PATH pair, where PATH is an existing file"""
+
+    name = "source:path"
+
+    def __init__(self, sources: list):
+        self.sources = sources
+
+    def convert(self, value, param, ctx):
+        source, separator, path = value.partition(":")
+        if not separator or not path:
+            self.fail(f"{value!r} is not in the SOURCE:PATH form", param, ctx)
+        if source not in self.sources:
+            self.fail(f"{source!r} is not one of {', '.join(self.sources)}", param, ctx)
+        if not os.path.isfile(path):
+            self.fail(f"File {path!r} does not exist", param, ctx)
+        return source, path
+
+
+class AccountNameSpec(click.ParamType):
+    """A SOURCE=NAME pair, where NAME is the name of the YNAB account of SOURCE"""
+
+    name = "source=name"
+
+    def __init__(self, sources: list):
+        self.sources = sources
+
+    def convert(self, value, param, ctx):
+        source, separator, name = value.partition("=")
+        if not separator or not name:
+            self.fail(f"{value!r} is not in the SOURCE=NAME form", param, ctx)
+        if source not in self.sources:
+            self.fail(f"{source!r} is not one of {', '.join(self.sources)}", param, ctx)
+        return source, name
+
+
+output_option = click.option(
+    "--output",
+    "outputs",
+    help="Write the output in FORMAT to PATH, or to the standard output if PATH is '-' (can be repeated); replaces --output-format",
+    type=OutputSpec(["table", "csv", "json", "ofx"]),
+    multiple=True,
+)
+
+output_file_option = click.option(
+    "-f",
+    "--output-file",
+    help="Write the output to this file instead of the standard output, compressed if it ends with .gz or .zst",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+)
+
+engine_option = click.option(
+    "--engine",
+    help="Engine reading the .xlsx file: iterparse is faster and uses less memory than openpyxl",
+    type=click.Choice(xlsx.ENGINES),
+    default="openpyxl",
+)
+
+
+def push_options(function):
+    """Add the options of the <bank> push commands"""
+    options = [
+        click.option(
+            "--budget-id",
+            help="YNAB budget to push the transactions to, not needed with --dry-run",
+            envvar="YNAB_BUDGET_ID",
+            default=None,
+        ),
+        click.option(
+            "--account-id",
+            help="YNAB account to push the transactions to",
+            required=True,
+        ),
+        click.option(
+            "--token",
+            help="YNAB personal access token",
+            envvar="YNAB_TOKEN",
+            default=None,
+        ),
+        click.option(
+            "--api-url",
+            help="YNAB API base URL",
+            envvar="YNAB_API_URL",
+            default=ynab.API_URL,
+        ),
+        click.option(
+            "--batch-size",
+            help="Transactions sent in each request",
+            type=click.IntRange(min=1),
+            default=ynab.BATCH_SIZE,
+        ),
+        click.option(
+            "--concurrency",
+            help="Requests in flight at the same time",
+            type=click.IntRange(min=1),
+            default=ynab.CONCURRENCY,
+        ),
+        click.option(
+            "--dry-run",
+            help="Print the request payload instead of sending it",
+            is_flag=True,
+            default=False,
+        ),
+    ]
+    for option in reversed(options):
+        function = option(function)
+    return function
+
+
+class LazyGroup(click.Group):
+    """A group adding the bank plugins as subcommands, imported only when invoked"""
+
+    def list_commands(self, ctx: click.Context):
+        return sorted(set(super().list_commands(ctx)) | set(plugins.names(plugins.BANKS)))
+
+    def get_command(self, ctx: click.Context, name: str):
+        command = super().get_command(ctx, name)
+        if command is None and name in plugins.registered(plugins.BANKS):
+            command = plugins.load(plugins.BANKS, name)
+        return command
+
+
+# Subcommands of the root group not needing the payee mappings.
+COMMANDS_WITHOUT_PAYEES = {"cache"}
+
+
+@click.group(cls=LazyGroup)
 @click.version_option()
 @click.option(
     "-p",
     "--payees-file",
     help="YAML file containing payee mappings",
-    type=click.Path(exists=True),
+    type=click.Path(dir_okay=False),
     default="payees.yml",
 )
 @click.option(
@@ -35,18 +182,44 @@ from . import payee
     type=click.DateTime(),
     default=None,
 )
+@click.option(
+    "--cache/--no-cache",
+    help="Cache parsed statement rows, so reading the same file again skips the parsing",
+    default=False,
+)
+@click.option(
+    "--cache-size",
+    help="Maximum size of the cache in MB",
+    type=click.IntRange(min=1),
+    default=256,
+)
+@click.option(
+    "--payee-workers",
+    help="Resolve payees using this many worker processes, for large statements and mappings",
+    type=click.IntRange(min=1),
+    default=1,
+)
 @click.pass_context
-def cli(ctx: click.Context, payees_file: str, start_date: datetime.datetime = None, end_date: datetime.datetime = None):
+def cli(ctx: click.Context, payees_file: str, start_date: datetime.datetime = None, end_date: datetime.datetime = None, cache: bool = False, cache_size: int = 256, payee_workers: int = 1):
     "CLI tool to support data import and export from YNAB"
+    ctx.ensure_object(dict)
+    ctx.obj["cache"] = RowCache(max_size=cache_size * 1024 * 1024) if cache else None
+
+    # The cache commands resolve no payee: they work without a payees file
+    if ctx.invoked_subcommand in COMMANDS_WITHOUT_PAYEES:
+        return
+
     try:
         with open(payees_file, "r") as f:
             mappings = yaml.safe_load(f)
             
-            payee_resolver = payee.PayeeResolver()
+            payee_resolver = payee.PayeeResolver(workers=payee_workers)
             payee_resolver.load_mappings(mappings)
+            ctx.call_on_close(payee_resolver.close)
 
             ctx.ensure_object(dict)
             ctx.obj["payee_resolver"] = payee_resolver
+            ctx.obj["payee_mappings"] = mappings
             ctx.obj["start_date"] = start_date
             ctx.obj["end_date"] = end_date
 
@@ -58,62 +231,92 @@ def cli(ctx: click.Context, payees_file: str, start_date: datetime.datetime = No
         ) from e
 
 @cli.group()
-def fineco():
-    "Fineco related commands"
+def cache():
+    "Parsed statements cache commands"
 
 
-@cli.group()
-def satispay():
-    "Satispay related commands"
+@cache.command(name="clear")
+def cache_clear():
+    "Remove every entry from the parsed statements cache"
+    removed = RowCache().clear()
+    click.echo(f"Removed {removed} cache entries")
 
 
-@cli.group()
-def n26():
-    "N26 related commands"
+def open_source(ctx: click.Context, source: str, file_name: str):
+    """Return the input and output for a file of the given source, with default reader options."""
+    try:
+        open_file = plugins.load(plugins.SOURCES, source)
+    except KeyError:
+        raise click.BadParameter(f"Unknown source {source}", param_hint="source") from None
+    return open_file(ctx, file_name)
+
+
+# Sources accepted by the commands working across banks.
+SOURCES = plugins.names(plugins.SOURCES)
 
 
-@fineco.command(name="describe-account-transactions")
+@cli.command()
+@click.argument(
+    "source",
+    type=click.Choice(SOURCES),
+)
 @click.argument(
-    "excel-file-name",
+    "file-name",
 )
 @click.option(
-    "-o",
-    "--output-format",
-    help="Output format",
-    type=click.Choice(["table", "csv", "json"]),
-    default="table",
+    "-d",
+    "--database",
+    help="SQLite database file",
+    type=click.Path(dir_okay=False),
+    default=ledger.default_path,
+    show_default="~/.local/share/ynabkit/ledger.db",
 )
+@click.pass_context
+def ingest(ctx: click.Context, source: str, file_name: str, database: str):
+    "Load the transactions of a file into the local ledger database"
+    input, output = open_source(ctx, source, file_name)
+    records = output.records(input.read())
+
+    with ledger.Ledger(database) as store:
+        inserted, total = store.ingest(source, records, ctx.obj["payee_mappings"])
+
+    click.echo(f"Ingested {total} transactions from {file_name} ({inserted} new)")
+    report_unresolved(ctx.obj["payee_resolver"])
+
+
+@cli.command()
 @click.option(
-    "-m",
-    "--min-row",
-    help="Minimum row to start reading from",
-    type=int,
-    default=11,
+    "-d",
+    "--database",
+    help="SQLite database file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=ledger.default_path,
+    show_default="~/.local/share/ynabkit/ledger.db",
 )
 @click.option(
-    "-c",
-    "--max-col",
-    help="Maximum column to read to",
-    type=int,
-    default=8,
+    "--source",
+    "sources",
+    help="Only transactions from this source (can be repeated)",
+    type=click.Choice(SOURCES),
+    multiple=True,
 )
-@click.pass_context
-def describe_account_transactions(ctx: click.Context, excel_file_name: str, output_format: str, min_row: int, max_col: int):
-    "Read an .xlsx file containing bank account transactions and output the in a table, CSV or JSON file"
-    payee_resolver = ctx.obj["payee_resolver"]
-    describe(
-        AccountTransactionsInput(excel_file_name, payee_resolver, min_row, max_col),
-        AccountTransactionsOutput(),
-        payee_resolver,
-        output_format,
-        ctx.obj.get("start_date"),
-        ctx.obj.get("end_date"),
-    )
-
-
-@fineco.command(name="describe-card-transactions")
-@click.argument(
-    "excel-file-name",
+@click.option(
+    "--payee",
+    "payee_name",
+    help="Only transactions with this payee",
+    default=None,
+)
+@click.option(
+    "--min-amount",
+    help="Minimum amount",
+    type=float,
+    default=None,
+)
+@click.option(
+    "--max-amount",
+    help="Maximum amount",
+    type=float,
+    default=None,
 )
 @click.option(
     "-o",
@@ -122,29 +325,41 @@ def describe_account_transactions(ctx: click.Context, excel_file_name: str, outp
     type=click.Choice(["table", "csv", "json"]),
     default="table",
 )
-@click.option(
-    "-c",
-    "--circuit",
-    help="Credit card circuit",
-    type=click.Choice(["ALL", "BANCOMAT", "VISA", "MASTERCARD"]),
-    default="ALL",
-)
 @click.pass_context
-def describe_card_transactions(ctx: click.Context, excel_file_name: str, output_format: str, circuit: str = None):
-    "Read an .xlsx file containing credit card transactions and output the in a table or a CSV file"
-    payee_resolver = ctx.obj["payee_resolver"]
-    describe(
-        CreditCardTransactionsInput(excel_file_name, payee_resolver, circuit=circuit),
-        CreditCardTransactionsOutput(),
-        payee_resolver,
-        output_format,
-        ctx.obj.get("start_date"),
-        ctx.obj.get("end_date"),
-    )
-
-@satispay.command(name="describe-transactions")
+def query(ctx: click.Context, database: str, sources: tuple, payee_name: str, min_amount: float, max_amount: float, output_format: str):
+    "Output the ledger transactions matching the filters in a table, CSV or JSON file"
+    with ledger.Ledger(database) as store:
+        records = store.query(
+            sources=list(sources),
+            payee=payee_name,
+            start_date=ctx.obj.get("start_date"),
+            end_date=ctx.obj.get("end_date"),
+            min_amount=to_milliunits(min_amount) if min_amount is not None else None,
+            max_amount=to_milliunits(max_amount) if max_amount is not None else None,
+        )
+
+        output = RecordsOutput()
+        if output_format == "table":
+            click.echo(output.table(records))
+        elif output_format == "csv":
+            click.echo(output.csv(records))
+        elif output_format == "json":
+            click.echo(output.json(records))
+
+
+@cli.command()
 @click.argument(
-    "excel-file-name",
+    "inputs",
+    metavar="SOURCE:FILE...",
+    type=SourceSpec(SOURCES),
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    "--sort",
+    help="Sort each file by date before merging, for files neither oldest nor newest first",
+    is_flag=True,
+    default=False,
 )
 @click.option(
     "-o",
@@ -154,44 +369,150 @@ def describe_card_transactions(ctx: click.Context, excel_file_name: str, output_
     default="table",
 )
 @click.option(
-    "-e",
-    "--exclude-kinds",
-    help="Exclude kinds",
-    type=click.Choice([
-        "🏦 From Bank",
-        "🏬 to a Store",
-        "👤 to Person",
-        "👤 from Person",
-        "📱 Mobile Top-up",
-    ]),
-    default=None,
+    "--transfers",
+    "match_transfers",
+    help="Mark the transfers between the sources, so YNAB imports them as transfers (reads the files in memory)",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--transfer-window",
+    help="Maximum days between the two sides of a transfer",
+    type=click.IntRange(min=0),
+    default=transfers.WINDOW_DAYS,
+)
+@click.option(
+    "--account-name",
+    "account_names",
+    help="Name of the YNAB account of a source, used in the transfer payees (can be repeated)",
+    type=AccountNameSpec(SOURCES),
+    multiple=True,
 )
+@output_file_option
 @click.pass_context
-def describe_transactions(ctx: click.Context, excel_file_name: str, output_format: str, exclude_kinds: str = None):
-    "Read an .xlsx file containing credit card transactions and output the in a table or a CSV file"
-    payee_resolver = ctx.obj["payee_resolver"]
-    describe(
-        TransactionsInput(
-            excel_file_name,
-            exclude_kinds=exclude_kinds,
-            payee_resolver=payee_resolver
-        ),
-        TransactionsOutput(),
-        payee_resolver,
-        output_format,
-        ctx.obj.get("start_date"),
-        ctx.obj.get("end_date"),
-    )
-
-@n26.command(name="describe-transactions")
+def merge(ctx: click.Context, inputs: tuple, sort: bool, output_format: str, match_transfers: bool, transfer_window: int, account_names: tuple, output_file: str):
+    "Merge the transactions of several files into a single stream sorted by date"
+    if output_file:
+        try:
+            files.check_output(output_file)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="output-file") from e
+
+    sources = []
+    for source, file_name in inputs:
+        input, output = open_source(ctx, source, file_name)
+        records = output.records(input)
+        if sort:
+            records = sorted(records, key=lambda record: record.date)
+        else:
+            # Checked before anything is written, so a file out of order
+            # does not leave a partial output behind
+            try:
+                records = in_date_order(source, records)
+            except UnsortedSourceError as e:
+                raise click.ClickException(f"{e}; use --sort to merge files that are not sorted by date") from e
+        sources.append((source, records))
+
+    records = merge_sorted(sources)
+    if match_transfers:
+        # Matched before the date filter, so that a transfer across the
+        # start or end date is still recognised
+        records = transfers.mark_transfers(records, transfer_window, dict(account_names))
+
+    start_date = ctx.obj.get("start_date")
+    end_date = ctx.obj.get("end_date")
+    if start_date:
+        records = (r for r in records if r.date >= start_date)
+    if end_date:
+        records = (r for r in records if r.date <= end_date)
+
+    chunks = render_records(RecordsOutput(), output_format, records)
+    if output_file:
+        with files.open_output(output_file) as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        for chunk in chunks:
+            click.echo(chunk, nl=False)
+
+    report_unresolved(ctx.obj["payee_resolver"])
+
+
+@cli.group()
+def payees():
+    "Payee mappings related commands"
+
+
+@payees.command(name="suggest")
+@click.argument(
+    "source",
+    type=click.Choice(SOURCES),
+)
 @click.argument(
-    "csv-file-name",
+    "file-names",
+    nargs=-1,
+    required=True,
 )
 @click.option(
-    "-s",
-    "--skip-header",
-    help="Skip the header row",
-    default=True,
+    "-l",
+    "--limit",
+    help="Maximum number of payees suggested for each memo",
+    type=click.IntRange(min=1),
+    default=3,
+)
+@click.option(
+    "--min-score",
+    help="Minimum similarity (0 to 1) of a suggestion",
+    type=click.FloatRange(min=0, max=1),
+    default=0.3,
+)
+@click.option(
+    "--yaml",
+    "as_yaml",
+    help="Output the best suggestions as payees.yml entries",
+    is_flag=True,
+    default=False,
+)
+@click.pass_context
+def payees_suggest(ctx: click.Context, source: str, file_names: tuple, limit: int, min_score: float, as_yaml: bool):
+    "Suggest payees for the unresolved memos, based on similar memos that already resolve"
+    suggester = payee.PayeeSuggester()
+    unresolved = set()
+    for file_name in file_names:
+        input, output = open_source(ctx, source, file_name)
+        for record in output.records(input.read()):
+            if record.payee:
+                suggester.add(record.memo, record.payee)
+            elif record.memo:
+                unresolved.add(record.memo)
+
+    suggestions = {
+        memo: suggester.suggest(memo, limit=limit, min_score=min_score)
+        for memo in sorted(unresolved)
+    }
+
+    output = SuggestionsOutput()
+    if as_yaml:
+        click.echo(output.yaml(suggestions), nl=False)
+    else:
+        click.echo(output.table(suggestions))
+
+
+@payees.command(name="refresh")
+@click.option(
+    "-d",
+    "--database",
+    help="SQLite database file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=ledger.default_path,
+    show_default="~/.local/share/ynabkit/ledger.db",
+)
+@click.option(
+    "--source",
+    "sources",
+    help="Only transactions from this source (can be repeated)",
+    type=click.Choice(SOURCES),
+    multiple=True,
 )
 @click.option(
     "-o",
@@ -201,39 +522,159 @@ def describe_transactions(ctx: click.Context, excel_file_name: str, output_forma
     default="table",
 )
 @click.pass_context
-def describe_n26_transactions(ctx: click.Context, csv_file_name: str, skip_header: bool, output_format: str):
-    "Read an .csv file containing N26 transactions and output the in a table or a CSV file"
-    payee_resolver = ctx.obj["payee_resolver"]
-    describe(
-        N26TransactionsInput(
-            csv_file_name,
-            skip_header=skip_header,
-            payee_resolver=payee_resolver
-        ),
-        N26TransactionsOutput(),
-        payee_resolver,
-        output_format,
-        ctx.obj.get("start_date"),
-        ctx.obj.get("end_date"),
-    )
+def payees_refresh(ctx: click.Context, database: str, sources: tuple, output_format: str):
+    "Resolve the payees of the ledger transactions again after editing payees.yml, and output the transactions whose payee changed"
+    changes = []
+    with ledger.Ledger(database) as store:
+        for source in sources or store.sources():
+            refreshed = store.refresh(source, ctx.obj["payee_mappings"])
+            click.echo(f"{source}: {len(refreshed)} transactions changed payee", err=True)
+            changes.extend(
+                diff.Change(diff.CHANGED, record, fields={"payee": (old_payee, record.payee)})
+                for record, old_payee in refreshed
+            )
+
+    output = ChangesOutput()
+    if output_format == "table":
+        click.echo(output.table(changes))
+    elif output_format == "csv":
+        click.echo(output.csv(changes))
+    elif output_format == "json":
+        click.echo(output.json(changes))
+
+
+def describe(input, output, payee_resolver: payee.PayeeResolver, output_format: str, start_date: datetime.datetime = None, end_date: datetime.datetime = None, outputs: list = (), output_file: str = None):
+    """Read from input and write to output in the specified format.
 
+    The output goes to `output_file` if set, to the standard output
+    otherwise. If `outputs` lists (format, path) pairs, the transactions
+    are read once and written in each format to its path instead.
+    """
+    outputs = list(outputs)
+    if output_file:
+        outputs.append((output_format, output_file))
+
+    for _, path in outputs:
+        if path != "-":
+            try:
+                files.check_output(path)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="output") from e
 
-def describe(input, output, payee_resolver: payee.PayeeResolver, output_format: str, start_date: datetime.datetime = None, end_date: datetime.datetime = None):
-    """Read from input and write to output in the specified format."""
     transactions = input.read()
     
-    if start_date:
-        transactions = [t for t in transactions if t.timestamp >= start_date]
-    if end_date:
-        transactions = [t for t in transactions if t.timestamp <= end_date]
+    if start_date or end_date:
+        transactions = TransactionIndex(transactions).filter(start_date, end_date)
+
+    if not outputs:
+        render(output, output_format, transactions)
+
+    for output_format, path in outputs:
+        if path == "-":
+            render(output, output_format, transactions)
+        else:
+            with files.open_output(path) as f:
+                render(output, output_format, transactions, f)
+
+    report_unresolved(payee_resolver)
+
+
+def compare(old_input, new_input, output, payee_resolver: payee.PayeeResolver, output_format: str, output_file: str = None):
+    """Read two exports of the same account and write what changed between them in the specified format."""
+    if output_file:
+        try:
+            files.check_output(output_file)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="output-file") from e
+
+    old = old_input.read()
+    new = new_input.read()
+    changes = list(diff.diff(zip(old, output.records(old)), zip(new, output.records(new))))
+
+    if output_file:
+        with files.open_output(output_file) as f:
+            render(ChangesOutput(), output_format, changes, f)
+    else:
+        render(ChangesOutput(), output_format, changes)
+
+    report_unresolved(payee_resolver)
+
+
+def push(input, output, payee_resolver: payee.PayeeResolver, budget_id: str, account_id: str, token: str, api_url: str, batch_size: int, concurrency: int, dry_run: bool, start_date: datetime.datetime = None, end_date: datetime.datetime = None):
+    """Read from input and create the transactions in a YNAB account."""
+    if not budget_id and not dry_run:
+        raise click.UsageError("Missing --budget-id (or the YNAB_BUDGET_ID environment variable)")
+    if not token and not dry_run:
+        raise click.UsageError("Missing --token (or the YNAB_TOKEN environment variable)")
+
+    records = list(output.records(input.read()))
+    # The import ids count the occurrences in the whole file, so they don't
+    # change with the dates pushed
+    import_ids = ynab.import_ids(records)
+
+    # Filtered on the date pushed, e.g. the registration date of a card
+    # transaction, not on its timestamp
+    payloads = [
+        ynab.transaction_payload(record, account_id, import_id)
+        for record, import_id in zip(records, import_ids)
+        if (not start_date or record.date >= start_date)
+        and (not end_date or record.date <= end_date)
+    ]
+
+    if dry_run:
+        click.echo(json.dumps({"transactions": payloads}, indent=4))
+    else:
+        try:
+            with ynab.Client(token, api_url, batch_size=batch_size, concurrency=concurrency) as client:
+                result = client.create_transactions(budget_id, payloads)
+        except ynab.YNABError as e:
+            raise click.ClickException(str(e)) from e
+
+        click.echo(
+            f"Pushed {len(payloads)} transactions in {result.batches} requests: "
+            f"{result.created} created, {result.duplicates} already in YNAB"
+        )
+
+    report_unresolved(payee_resolver)
+
+
+def render(output, output_format: str, transactions: list, file=None):
+    """Write the transactions in the specified format to file (the standard output by default)."""
+    if file is None:
+        def write(text: str):
+            click.echo(text, nl=False)
+    else:
+        # Unlike click.echo, file.write does not flush on every call
+        write = file.write
 
     if output_format == "table":
-        click.echo(output.table(transactions))
+        write(output.table(transactions) + "\n")
     elif output_format == "csv":
-        click.echo(output.csv(transactions))
+        write(output.csv(transactions) + "\n")
     elif output_format == "json":
-        click.echo(output.json(transactions))
-    
+        write(output.json(transactions) + "\n")
+    elif output_format == "ofx":
+        for chunk in output.ofx(transactions):
+            write(chunk)
+
+
+def render_records(output: RecordsOutput, output_format: str, records: Iterable[Record]) -> Iterator[str]:
+    """Render the records in the specified format, one chunk at a time.
+
+    CSV and JSON are rendered as the records are read; the table needs
+    every record before it can be laid out.
+    """
+    if output_format == "table":
+        yield output.table(records) + "\n"
+    elif output_format == "csv":
+        yield from output.iter_csv(records)
+    elif output_format == "json":
+        yield from output.iter_json(records)
+        yield "\n"
+
+
+def report_unresolved(payee_resolver: payee.PayeeResolver):
+    """Print the memos the payee resolver could not resolve to stderr."""
     if payee_resolver.unresolved:
         click.echo(f"There are {len(payee_resolver.unresolved)} unresolved memos:", file=sys.stderr)
         for memo in payee_resolver.unresolved:
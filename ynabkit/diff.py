@@ -0,0 +1,75 @@
+import dataclasses
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, Iterator, Tuple
+
+from .models import Record
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+
+@dataclasses.dataclass
+class Change:
+    """A transaction added, removed or changed between two exports"""
+    status: str
+    # The record of the new transaction, or of the old one if removed
+    record: Record
+    old: Any = None
+    new: Any = None
+    # The fields that changed, with their (old, new) values
+    fields: Dict[str, Tuple[Any, Any]] = dataclasses.field(default_factory=dict)
+
+
+def fingerprint(transaction: Any, record: Record) -> Hashable:
+    """Return the key identifying a transaction across exports.
+
+    It is made of the day the operation happened, the amount and the memo:
+    fields that stay the same when a pending transaction is booked.
+    """
+    return transaction.timestamp.date(), record.amount, record.memo
+
+
+def diff(old: Iterable[Tuple[Any, Record]], new: Iterable[Tuple[Any, Record]]) -> Iterator[Change]:
+    """Compare two exports of the same account, given as (transaction, record) pairs.
+
+    The old export is indexed by fingerprint in a dict, then each new
+    transaction is looked up in it, so the comparison takes linear time.
+    Transactions sharing a fingerprint (two coffees at the same bar on the
+    same day) are paired in file order, through an occurrence counter.
+
+    Added and changed transactions are yielded in the order of the new
+    export, then the removed ones in the order of the old export.
+    """
+    index = {}
+    occurrences = defaultdict(int)
+    for transaction, record in old:
+        key = fingerprint(transaction, record)
+        index[key, occurrences[key]] = (transaction, record)
+        occurrences[key] += 1
+
+    occurrences.clear()
+    for transaction, record in new:
+        key = fingerprint(transaction, record)
+        match = index.pop((key, occurrences[key]), None)
+        occurrences[key] += 1
+
+        if match is None:
+            yield Change(ADDED, record, new=transaction)
+            continue
+
+        fields = changed_fields(match[0], transaction)
+        if fields:
+            yield Change(CHANGED, record, old=match[0], new=transaction, fields=fields)
+
+    for transaction, record in index.values():
+        yield Change(REMOVED, record, old=transaction)
+
+
+def changed_fields(old: Any, new: Any) -> Dict[str, Tuple[Any, Any]]:
+    """Return the fields of two transaction dataclasses that differ, with their (old, new) values"""
+    return {
+        field.name: (getattr(old, field.name), getattr(new, field.name))
+        for field in dataclasses.fields(old)
+        if getattr(old, field.name) != getattr(new, field.name)
+    }
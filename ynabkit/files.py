@@ -0,0 +1,74 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+from typing import Iterator, TextIO
+
+# Size of the write buffers: large writes keep the number of system calls
+# (and of compressor invocations) low.
+BUFFER_SIZE = 1024 * 1024
+
+
+@contextlib.contextmanager
+def open_output(path: str, buffer_size: int = BUFFER_SIZE) -> Iterator[TextIO]:
+    """Open a text stream that writes to path atomically.
+
+    The data goes to a temporary file in the same directory, which is
+    renamed to path only once everything has been written, so readers
+    never see a partial file. The stream is compressed on the fly when
+    path ends with .gz (gzip) or .zst (zstd, requires the zstandard
+    package).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb", buffering=buffer_size) as raw:
+            compressor = _compressor(path, raw)
+            stream = io.BufferedWriter(compressor, buffer_size) if compressor else raw
+            text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+            try:
+                yield text
+            finally:
+                # Detach the wrapper, so that it can't close raw behind our back
+                text.detach()
+
+            # Closing the compressor writes its trailer and leaves raw open
+            if compressor:
+                stream.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        # mkstemp creates the file readable only by the owner
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def check_output(path: str):
+    """Raise ValueError if the compression path asks for is not available"""
+    if path.endswith(".zst"):
+        _zstandard(path)
+
+
+def _compressor(path: str, raw: io.BufferedWriter):
+    if path.endswith(".gz"):
+        return gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0)
+
+    if path.endswith(".zst"):
+        return _zstandard(path).ZstdCompressor().stream_writer(raw, closefd=False)
+
+    return None
+
+
+def _zstandard(path: str):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(f"Writing {path} requires the zstandard package: pip install 'ynabkit[zstd]'") from None
+    return zstandard
@@ -0,0 +1,170 @@
+import click
+
+from ..cli import compare, describe, engine_option, output_file_option, output_option, push, push_options
+from .inputs import AccountTransactionsInput, CreditCardTransactionsInput
+from .outputs import AccountTransactionsOutput, CreditCardTransactionsOutput
+
+
+@click.group()
+def fineco():
+    "Fineco related commands"
+
+
+@fineco.command(name="describe-account-transactions")
+@click.argument(
+    "excel-file-name",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json", "ofx"]),
+    default="table",
+)
+@output_option
+@output_file_option
+@click.option(
+    "-m",
+    "--min-row",
+    help="Minimum row to start reading from",
+    type=int,
+    default=11,
+)
+@click.option(
+    "-c",
+    "--max-col",
+    help="Maximum column to read to",
+    type=int,
+    default=8,
+)
+@engine_option
+@click.pass_context
+def describe_account_transactions(ctx: click.Context, excel_file_name: str, output_format: str, outputs: tuple, output_file: str, min_row: int, max_col: int, engine: str):
+    "Read an .xlsx file containing bank account transactions and output the in a table, CSV or JSON file"
+    payee_resolver = ctx.obj["payee_resolver"]
+    describe(
+        AccountTransactionsInput(excel_file_name, payee_resolver, min_row, max_col, cache=ctx.obj["cache"], engine=engine),
+        AccountTransactionsOutput(),
+        payee_resolver,
+        output_format,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+        outputs,
+        output_file,
+    )
+
+
+@fineco.command(name="describe-card-transactions")
+@click.argument(
+    "excel-file-name",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json", "ofx"]),
+    default="table",
+)
+@output_option
+@output_file_option
+@click.option(
+    "-c",
+    "--circuit",
+    help="Credit card circuit",
+    type=click.Choice(["ALL", "BANCOMAT", "VISA", "MASTERCARD"]),
+    default="ALL",
+)
+@click.pass_context
+def describe_card_transactions(ctx: click.Context, excel_file_name: str, output_format: str, outputs: tuple, output_file: str, circuit: str = None):
+    "Read an .xlsx file containing credit card transactions and output the in a table or a CSV file"
+    payee_resolver = ctx.obj["payee_resolver"]
+    describe(
+        CreditCardTransactionsInput(excel_file_name, payee_resolver, circuit=circuit, cache=ctx.obj["cache"]),
+        CreditCardTransactionsOutput(),
+        payee_resolver,
+        output_format,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+        outputs,
+        output_file,
+    )
+
+
+@fineco.command(name="diff")
+@click.argument(
+    "old-file-name",
+)
+@click.argument(
+    "new-file-name",
+)
+@click.option(
+    "-k",
+    "--kind",
+    help="Kind of statement",
+    type=click.Choice(["account", "card"]),
+    default="account",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+)
+@output_file_option
+@click.pass_context
+def diff_transactions(ctx: click.Context, old_file_name: str, new_file_name: str, kind: str, output_format: str, output_file: str):
+    "Compare two exports of the same account or credit card and output the added, removed and changed transactions"
+    open_file = open_account if kind == "account" else open_card
+    old_input, output = open_file(ctx, old_file_name)
+    new_input, _ = open_file(ctx, new_file_name)
+    compare(old_input, new_input, output, ctx.obj["payee_resolver"], output_format, output_file)
+
+
+@fineco.command(name="push")
+@click.argument(
+    "file-name",
+)
+@click.option(
+    "-k",
+    "--kind",
+    help="Kind of statement",
+    type=click.Choice(["account", "card"]),
+    default="account",
+)
+@push_options
+@click.pass_context
+def push_transactions(ctx: click.Context, file_name: str, kind: str, budget_id: str, account_id: str, token: str, api_url: str, batch_size: int, concurrency: int, dry_run: bool):
+    "Create the transactions of a Fineco statement in a YNAB account through the YNAB API"
+    open_file = open_account if kind == "account" else open_card
+    input, output = open_file(ctx, file_name)
+    push(
+        input,
+        output,
+        ctx.obj["payee_resolver"],
+        budget_id,
+        account_id,
+        token,
+        api_url,
+        batch_size,
+        concurrency,
+        dry_run,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+    )
+
+
+def open_account(ctx: click.Context, file_name: str):
+    """Return the input and output for a bank account statement, with default reader options."""
+    return (
+        AccountTransactionsInput(file_name, ctx.obj["payee_resolver"], 11, 8, cache=ctx.obj["cache"]),
+        AccountTransactionsOutput(),
+    )
+
+
+def open_card(ctx: click.Context, file_name: str):
+    """Return the input and output for a credit card statement, with default reader options."""
+    return (
+        CreditCardTransactionsInput(file_name, ctx.obj["payee_resolver"], circuit="ALL", cache=ctx.obj["cache"]),
+        CreditCardTransactionsOutput(),
+    )
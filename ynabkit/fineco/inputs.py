@@ -1,28 +1,64 @@
-from typing import Callable, List
+from typing import Callable, Iterator, List, Tuple
 import datetime
 
 import xlrd
-from openpyxl import load_workbook
 
+from ..amounts import to_milliunits
+from ..cache import RowCache
+from ..payee import resolve_all
+from ..xlsx import read_rows
 from .models import AccountTransaction, CreditCardTransaction
 
+# Column types of the parsed rows stored in the cache (see RowCache).
+ACCOUNT_COLUMNS = "tissss"
+CREDIT_CARD_COLUMNS = "ssttsssssi"
+
 
 class AccountTransactionsInput:
     """Read an .xlsx file containing bank account transactions into a list of AccountTransaction objects"""
 
-    def __init__(self, excel_file: str, resolve_payee: Callable[[str], str], min_row: int, max_col: int):
+    def __init__(self, excel_file: str, resolve_payee: Callable[[str], str], min_row: int, max_col: int, cache: RowCache = None, engine: str = "openpyxl"):
         self.excel_file = excel_file
         self.resolve_payee = resolve_payee
         self.min_row = min_row
         self.max_col = max_col
+        self.cache = cache
+        self.engine = engine
 
     def read(self) -> List[AccountTransaction]:
         """Read an .xlsx file containing bank account transactions into a list of AccountTransaction objects"""
-        workbook = load_workbook(filename=self.excel_file)
-        ws = workbook.active
+        return list(self)
+
+    def __iter__(self) -> Iterator[AccountTransaction]:
+        """Yield the AccountTransaction objects one at a time, in file order"""
+        if self.cache:
+            rows = self.cache.load(
+                self.cache.key(self.excel_file, reader="fineco-account", min_row=self.min_row, max_col=self.max_col),
+                ACCOUNT_COLUMNS,
+                self._parse,
+            )
+        else:
+            rows = self._parse()
+
+        # Join description and description_full to create a unique key for
+        # the payee resolver
+        payees = resolve_all(self.resolve_payee, [f"{row[2]}: {row[3]}" for row in rows])
+
+        for (date, amount, description, description_full, state, moneymap_category), payee in zip(rows, payees):
+            yield AccountTransaction(
+                date=date,
+                amount=amount,
+                description=description,
+                description_full=description_full,
+                state=state,
+                moneymap_category=moneymap_category,
+                payee=payee,
+            )
 
-        transactions = []
-        for row in ws.iter_rows(min_row=self.min_row, max_col=self.max_col):
+    def _parse(self) -> List[Tuple]:
+        """Parse the workbook into rows of (date, amount, description, description_full, state, moneymap_category)"""
+        rows = []
+        for row in read_rows(self.excel_file, min_row=self.min_row, max_col=self.max_col, engine=self.engine):
             # Fields:
             # ------------------------------------------------------------
             # 0: Data_Operazione
@@ -34,7 +70,7 @@ class AccountTransactionsInput:
             # 6: Stato
             # 7: Moneymap
             # ------------------------------------------------------------
-            date_value = row[0].value
+            date_value = row[0]
 
             # Skip rows with no Data_Operazione (empty or '-'):
             # This means the transaction is not yet booked, so
@@ -50,39 +86,74 @@ class AccountTransactionsInput:
             if not isinstance(date_value, datetime.datetime):
                 raise ValueError(f"Invalid date value: {date_value}. Expected a datetime object.")
 
-            t = AccountTransaction(
-                date=date_value,
-                amount=row[2].value or row[3].value,
-                description=row[4].value,
-                description_full=row[5].value,
-                state=row[6].value,
-                moneymap_category=row[7].value,
-                # Join description and description_full to create a
-                # unique key for the payee resolver
-                payee=self.resolve_payee(f"{row[4].value}: {row[5].value}"),
-            )
+            amount = row[2] or row[3]
 
-            transactions.append(t)
+            rows.append((
+                date_value,
+                to_milliunits(amount) if amount is not None else None,
+                row[4],
+                row[5],
+                row[6],
+                row[7],
+            ))
 
-        return transactions
+        return rows
 
 class CreditCardTransactionsInput:
     """Read a credit card statement and output a list of CreditCardTransaction objects"""
 
-    def __init__(self, excel_file: str, resolve_payee: Callable[[str], str], circuit: str = None):
+    def __init__(self, excel_file: str, resolve_payee: Callable[[str], str], circuit: str = None, cache: RowCache = None):
         self.excel_file = excel_file
         self.resolve_payee = resolve_payee
         self.circuit = circuit
+        self.cache = cache
 
     def read(self) -> List[CreditCardTransaction]:
         """Read a credit card statement and output a list of CreditCardTransaction objects"""
+        return list(self)
+
+    def __iter__(self) -> Iterator[CreditCardTransaction]:
+        """Yield the CreditCardTransaction objects one at a time, in file order"""
+        if self.cache:
+            rows = self.cache.load(
+                self.cache.key(self.excel_file, reader="fineco-card"),
+                CREDIT_CARD_COLUMNS,
+                self._parse,
+            )
+        else:
+            rows = self._parse()
+
+        # Every row is resolved, also those of the other circuits, so that
+        # their memos are reported as unresolved too
+        payees = resolve_all(self.resolve_payee, [row[4] for row in rows])
+
+        for (owner, card_number, transaction_date, registration_date, description, operation_state, operation_type, circuit, transaction_type, amount), payee in zip(rows, payees):
+            if self.circuit != "ALL" and circuit != self.circuit:
+                continue
+
+            yield CreditCardTransaction(
+                owner=owner,
+                card_number=card_number,
+                transaction_date=transaction_date,
+                registration_date=registration_date,
+                description=description,
+                operation_state=operation_state,
+                operation_type=operation_type,
+                circuit=circuit,
+                transaction_type=transaction_type,
+                amount=amount,
+                payee=payee,
+            )
+
+    def _parse(self) -> List[Tuple]:
+        """Parse the workbook into rows with the fields of CreditCardTransaction, payee excluded, of every circuit"""
         # Open the workbook
         workbook = xlrd.open_workbook(self.excel_file)
 
         # Select the first sheet (index 0) from the workbook
         sheet = workbook.sheet_by_index(0)
 
-        transactions = []
+        rows = []
 
         # Read data from cells with data
         for row in range(3, sheet.nrows):
@@ -90,7 +161,7 @@ class CreditCardTransactionsInput:
             cell_value = sheet.cell_value(row, 1)
             if cell_value == "":
                 continue
-                
+
             owner = sheet.cell_value(row, 1)
             card_number = sheet.cell_value(row, 2)
 
@@ -102,26 +173,19 @@ class CreditCardTransactionsInput:
             operation_type = sheet.cell_value(row, 7)
             circuit = sheet.cell_value(row, 8)
             transaction_type = sheet.cell_value(row, 9)
-            amount = sheet.cell_value(row, 10)
-            payee = self.resolve_payee(description)
-
-            if self.circuit != "ALL" and circuit != self.circuit:
-                continue
-
-            transaction = CreditCardTransaction(
-                owner=owner,
-                card_number=card_number,
-                transaction_date=transaction_date,
-                registration_date=registration_date,
-                description=description,
-                operation_state=operation_state,
-                operation_type=operation_type,
-                circuit=circuit,
-                transaction_type=transaction_type,
-                amount=amount,
-                payee=payee,
-            )
-
-            transactions.append(transaction)
-        
-        return transactions
+            amount = to_milliunits(sheet.cell_value(row, 10))
+
+            rows.append((
+                owner,
+                card_number,
+                transaction_date,
+                registration_date,
+                description,
+                operation_state,
+                operation_type,
+                circuit,
+                transaction_type,
+                amount,
+            ))
+
+        return rows
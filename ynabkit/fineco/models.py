@@ -13,17 +13,21 @@ class CreditCardTransaction:
     operation_type: str
     circuit: str
     transaction_type: str
-    amount: float
+    amount: int  # milliunits
     payee: str
 
     @property
     def timestamp(self) -> datetime.datetime:
         return self.transaction_date
 
+    @property
+    def kind(self) -> str:
+        return self.transaction_type
+
 @dataclasses.dataclass
 class AccountTransaction:
     date: datetime.datetime
-    amount: float
+    amount: int  # milliunits
     description: str
     description_full: str
     state: str
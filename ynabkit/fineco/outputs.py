@@ -2,11 +2,14 @@ import csv
 import io
 import json
 import sys
-from typing import List, Callable
+from typing import Iterable, Iterator, List, Callable
 
 from rich.console import Console
 from rich.table import Table
 
+from .. import ofx
+from ..amounts import format_milliunits, from_milliunits
+from ..models import Record
 from .models import AccountTransaction, CreditCardTransaction
 
 class AccountTransactionsOutput:
@@ -44,7 +47,7 @@ class AccountTransactionsOutput:
                 total_out += transaction.amount
             table.add_row(
                 str(transaction.date),
-                str(transaction.amount),
+                format_milliunits(transaction.amount),
                 transaction.description,
                 transaction.description_full,
                 transaction.state,
@@ -61,11 +64,10 @@ class AccountTransactionsOutput:
         summary_table.add_column("In")
         summary_table.add_column("Out")
         summary_table.add_column("Balance")
-        # format the balance to 2 decimal places:
         summary_table.add_row(
-            f"{total_in:.2f}",
-            f"{total_out:.2f}",
-            f"{(total_in + total_out):.2f}")
+            format_milliunits(total_in),
+            format_milliunits(total_out),
+            format_milliunits(total_in + total_out))
         console.print(summary_table)
 
         return console.file.getvalue()
@@ -87,14 +89,13 @@ class AccountTransactionsOutput:
             "Amount",
         ])
         
-        for transaction in transactions:
-            memo = f"{transaction.description}: {transaction.description_full}"
+        for record in self.records(transactions):
             writer.writerow([
                 # format the datetime as MM/DD/YYYY
-                transaction.date.strftime("%m/%d/%Y"),
-                transaction.payee,
-                memo,
-                str(transaction.amount),
+                record.date.strftime("%m/%d/%Y"),
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
             ])
         
         return output.getvalue()
@@ -103,6 +104,21 @@ class AccountTransactionsOutput:
         """Renders the transactions as a JSON string."""
         return json.dumps(transactions, cls=AccountTransactionsEncoder, indent=4)
 
+    def ofx(self, transactions: List[AccountTransaction]) -> Iterator[str]:
+        """Renders the transactions as an OFX statement, one chunk at a time."""
+        start, end = ofx.date_range(self.records(transactions))
+        return ofx.statement(self.records(transactions), start, end)
+
+    def records(self, transactions: Iterable[AccountTransaction]) -> Iterator[Record]:
+        """Map the transactions to the fields YNAB imports."""
+        for transaction in transactions:
+            yield Record(
+                date=transaction.date,
+                payee=transaction.payee,
+                memo=f"{transaction.description}: {transaction.description_full}",
+                amount=transaction.amount,
+            )
+
 class CreditCardTransactionsOutput:
     """Output a list of CreditCardTransaction objects in a table or a CSV file"""
 
@@ -144,7 +160,7 @@ class CreditCardTransactionsOutput:
                 transaction.operation_type,
                 transaction.circuit,
                 transaction.transaction_type,
-                str(transaction.amount),
+                format_milliunits(transaction.amount),
             )
 
         # turn table into a string using the Console
@@ -165,15 +181,13 @@ class CreditCardTransactionsOutput:
         
         writer = csv.writer(output)
         writer.writerow(["Date", "Payee", "Memo", "Amount"])
-        for transaction in transactions:
+        for record in self.records(transactions):
             writer.writerow([
                 # formate the datetime as MM/DD/YYYY
-                # transaction.transaction_date.strftime("%m/%d/%Y"),
-                transaction.registration_date.strftime("%m/%d/%Y"),
-                # transaction.transaction_date,
-                transaction.payee if transaction.payee else "",
-                transaction.description,
-                str(transaction.amount),
+                record.date.strftime("%m/%d/%Y"),
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
             ])
         
         return output.getvalue()
@@ -182,11 +196,29 @@ class CreditCardTransactionsOutput:
         """Renders the transactions as a JSON string."""
         return json.dumps(transactions, cls=CreditCardTransactionEncoder, indent=4)
 
+    def ofx(self, transactions: List[CreditCardTransaction]) -> Iterator[str]:
+        """Renders the transactions as an OFX statement, one chunk at a time."""
+        # Listed by transaction date, but dated by registration date
+        records = sorted(self.records(transactions), key=lambda record: record.date)
+        start, end = ofx.date_range(records)
+        return ofx.statement(records, start, end)
+
+    def records(self, transactions: Iterable[CreditCardTransaction]) -> Iterator[Record]:
+        """Map the transactions to the fields YNAB imports."""
+        for transaction in transactions:
+            yield Record(
+                # YNAB gets the registration date, not the transaction date
+                date=transaction.registration_date,
+                payee=transaction.payee if transaction.payee else "",
+                memo=transaction.description,
+                amount=transaction.amount,
+            )
+
 class AccountTransactionsEncoder(json.JSONEncoder):
     def default(self, obj):
         return {
             "date": obj.date.isoformat(),
-            "amount": obj.amount,
+            "amount": from_milliunits(obj.amount),
             "description": obj.description,
             "description_full": obj.description_full,
             "state": obj.state,
@@ -206,6 +238,6 @@ class CreditCardTransactionEncoder(json.JSONEncoder):
             "operation_type": obj.operation_type,
             "circuit": obj.circuit,
             "transaction_type": obj.transaction_type,
-            "amount": obj.amount,
+            "amount": from_milliunits(obj.amount),
             "payee": obj.payee if obj.payee else None,
         }   
@@ -0,0 +1,68 @@
+import bisect
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+
+class TransactionIndex:
+    """Answer filters on the transactions of any source without scanning them all.
+
+    The transactions are sorted once by timestamp, so a date window is found
+    with two binary searches. The payee and kind (for the models having one)
+    are indexed in hash tables on first use, each listing its transactions
+    in timestamp order: a combined filter walks the shortest list within the
+    window, so it costs O(log n + k) rather than a scan per filter.
+
+    Transactions are returned in the order they were given in.
+    """
+
+    def __init__(self, transactions: Iterable[Any]):
+        self.transactions = list(transactions)
+        # Read each timestamp once: it is a property on every model
+        timestamps = [t.timestamp for t in self.transactions]
+        # Positions of the transactions sorted by timestamp; the sort is
+        # stable, so ties keep their order
+        self._order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        self._timestamps = [timestamps[i] for i in self._order]
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def filter(
+        self,
+        start_date: datetime.datetime = None,
+        end_date: datetime.datetime = None,
+        payee: str = None,
+        kind: str = None,
+    ) -> List[Any]:
+        """Return the transactions between start_date and end_date (both included) with the given payee and kind"""
+        low = bisect.bisect_left(self._timestamps, start_date) if start_date is not None else 0
+        high = bisect.bisect_right(self._timestamps, end_date) if end_date is not None else len(self._timestamps)
+
+        # Ranks (positions in timestamp order) of the candidates: the window,
+        # or the shortest list of a hash index within the window
+        candidates = range(low, high)
+        filters = {field: value for field, value in (("payee", payee), ("kind", kind)) if value is not None}
+        shortest = None
+        for field, value in filters.items():
+            ranks = self._index(field).get(value, [])
+            ranks = ranks[bisect.bisect_left(ranks, low):bisect.bisect_left(ranks, high)]
+            if len(ranks) < len(candidates):
+                candidates, shortest = ranks, field
+
+        positions = [self._order[rank] for rank in candidates]
+        for field, value in filters.items():
+            if field != shortest:
+                positions = [i for i in positions if getattr(self.transactions[i], field, None) == value]
+
+        return [self.transactions[i] for i in sorted(positions)]
+
+    def _index(self, field: str) -> Dict[Any, List[int]]:
+        """Return the ranks of the transactions by value of field, building the index on first use"""
+        if field not in self._indexes:
+            index = defaultdict(list)
+            for rank, i in enumerate(self._order):
+                index[getattr(self.transactions[i], field, None)].append(rank)
+            self._indexes[field] = dict(index)
+        return self._indexes[field]
@@ -0,0 +1,271 @@
+import datetime
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import payee
+from .models import Record
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS payees (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    date TEXT NOT NULL,
+    -- milliunits
+    amount INTEGER NOT NULL,
+    payee_id INTEGER REFERENCES payees (id),
+    memo TEXT NOT NULL,
+    -- Tells apart identical transactions in the same file (two coffees on the
+    -- same day): the n-th copy gets occurrence n.
+    occurrence INTEGER NOT NULL,
+    UNIQUE (source_id, date, amount, memo, occurrence)
+);
+
+-- The payees.yml entries the payees of each source were resolved with,
+-- as JSON: refresh compares them with the current ones.
+CREATE TABLE IF NOT EXISTS mappings (
+    source_id INTEGER PRIMARY KEY REFERENCES sources (id),
+    payees TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS transactions_payee ON transactions (payee_id, date);
+CREATE INDEX IF NOT EXISTS transactions_amount ON transactions (amount);
+CREATE INDEX IF NOT EXISTS transactions_source ON transactions (source_id, date);
+"""
+
+
+class Ledger:
+    """Local SQLite store of the transactions read from every source.
+
+    Ingesting the same file twice is idempotent: transactions are keyed on
+    (source, date, amount, memo, occurrence), and a re-ingest only updates
+    their payee, since payees.yml may have changed in the meantime.
+
+    The ledger also keeps the payees.yml mappings each source was resolved
+    with, so that refresh can resolve again only the memos a change to the
+    mappings affects, without reading the files again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"{path} was created by a newer version of ynabkit (schema {version})")
+
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ingest(self, source: str, records: Iterable[Record], mappings: List[Dict[str, List[str]]] = None) -> Tuple[int, int]:
+        """Store the records read from a source, returning the number of new and total records
+
+        mappings are the payees.yml entries the records were resolved with:
+        the transactions of the source ingested before are refreshed with
+        them first, so that every transaction of a source agrees.
+        """
+        if mappings is not None:
+            self.refresh(source, mappings)
+
+        occurrences = {}
+        payee_ids = {}
+        total = 0
+        inserted = 0
+
+        with self.connection:
+            source_id = self._id("sources", source)
+
+            for record in records:
+                date = record.date.isoformat()
+                memo = record.memo or ""
+                key = (date, record.amount, memo)
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+
+                payee_id = None
+                if record.payee:
+                    payee_id = payee_ids.get(record.payee)
+                    if payee_id is None:
+                        payee_id = payee_ids[record.payee] = self._id("payees", record.payee)
+
+                cursor = self.connection.execute(
+                    "INSERT INTO transactions (source_id, date, amount, payee_id, memo, occurrence) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source_id, date, amount, memo, occurrence) DO NOTHING",
+                    (source_id, date, record.amount, payee_id, memo, occurrence),
+                )
+                if cursor.rowcount:
+                    inserted += 1
+                else:
+                    self.connection.execute(
+                        "UPDATE transactions SET payee_id = ? "
+                        "WHERE source_id = ? AND date = ? AND amount = ? AND memo = ? AND occurrence = ? "
+                        "AND payee_id IS NOT ?",
+                        (payee_id, source_id, date, record.amount, memo, occurrence, payee_id),
+                    )
+                total += 1
+
+            if mappings is not None:
+                self._save_mappings(source_id, mappings)
+
+        return inserted, total
+
+    def mappings(self, source: str) -> Optional[List[Dict[str, List[str]]]]:
+        """Return the payees.yml entries the transactions of a source were resolved with, None if unknown"""
+        row = self.connection.execute(
+            "SELECT m.payees FROM mappings m JOIN sources s ON s.id = m.source_id WHERE s.name = ?",
+            (source,),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def sources(self) -> List[str]:
+        """Return the names of the sources with transactions in the ledger"""
+        return [name for name, in self.connection.execute(
+            "SELECT name FROM sources WHERE id IN (SELECT source_id FROM transactions) ORDER BY name"
+        )]
+
+    def refresh(self, source: str, mappings: List[Dict[str, List[str]]]) -> List[Tuple[Record, str]]:
+        """Resolve the payees of a source again with new payees.yml entries
+
+        Only the memos whose payee could change are resolved again (see
+        payee.reresolve), or all of them if the ledger does not know the
+        mappings the source was resolved with. Returns the records whose payee
+        changed, with their previous payee, ordered by date.
+        """
+        old = self.mappings(source)
+        if old == mappings:
+            return []
+
+        changes = []
+        with self.connection:
+            source_id = self._id("sources", source)
+            transactions = self.connection.execute(
+                "SELECT t.id, t.date, t.amount, t.memo, COALESCE(p.name, '') "
+                "FROM transactions t LEFT JOIN payees p ON p.id = t.payee_id "
+                "WHERE t.source_id = ? ORDER BY t.date, t.id",
+                (source_id,),
+            ).fetchall()
+
+            resolutions = {memo: payee_name for _, _, _, memo, payee_name in transactions}
+            resolved = payee.reresolve(resolutions, old, mappings)
+
+            payee_ids = {name: self._id("payees", name) for name in set(resolved.values()) if name}
+            updates = []
+            for id, date, amount, memo, payee_name in transactions:
+                if memo not in resolved or resolved[memo] == payee_name:
+                    continue
+                updates.append((payee_ids.get(resolved[memo]), id))
+                changes.append((
+                    Record(
+                        date=datetime.datetime.fromisoformat(date),
+                        payee=resolved[memo],
+                        memo=memo,
+                        amount=amount,
+                        source=source,
+                    ),
+                    payee_name,
+                ))
+
+            self.connection.executemany("UPDATE transactions SET payee_id = ? WHERE id = ?", updates)
+            self._save_mappings(source_id, mappings)
+
+        return changes
+
+    def _save_mappings(self, source_id: int, mappings: List[Dict[str, List[str]]]):
+        self.connection.execute(
+            "INSERT INTO mappings (source_id, payees) VALUES (?, ?) "
+            "ON CONFLICT (source_id) DO UPDATE SET payees = excluded.payees",
+            (source_id, json.dumps(mappings)),
+        )
+
+    def query(
+        self,
+        sources: List[str] = None,
+        payee: str = None,
+        start_date: datetime.datetime = None,
+        end_date: datetime.datetime = None,
+        min_amount: int = None,
+        max_amount: int = None,
+    ) -> Iterator[Record]:
+        """Yield the stored records matching every given filter, ordered by date
+
+        Amounts are in milliunits.
+        """
+        conditions = []
+        parameters = []
+
+        if sources:
+            conditions.append(f"s.name IN ({', '.join('?' * len(sources))})")
+            parameters.extend(sources)
+        if payee is not None:
+            conditions.append("p.name = ?")
+            parameters.append(payee)
+        if start_date:
+            conditions.append("t.date >= ?")
+            parameters.append(start_date.isoformat())
+        if end_date:
+            conditions.append("t.date <= ?")
+            parameters.append(end_date.isoformat())
+        if min_amount is not None:
+            conditions.append("t.amount >= ?")
+            parameters.append(min_amount)
+        if max_amount is not None:
+            conditions.append("t.amount <= ?")
+            parameters.append(max_amount)
+
+        sql = (
+            "SELECT t.date, p.name, t.memo, t.amount, s.name "
+            "FROM transactions t "
+            "JOIN sources s ON s.id = t.source_id "
+            "LEFT JOIN payees p ON p.id = t.payee_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY t.date, t.id"
+
+        for date, payee_name, memo, amount, source in self.connection.execute(sql, parameters):
+            yield Record(
+                date=datetime.datetime.fromisoformat(date),
+                payee=payee_name or "",
+                memo=memo,
+                amount=amount,
+                source=source,
+            )
+
+    def _id(self, table: str, name: str) -> int:
+        self.connection.execute(f"INSERT INTO {table} (name) VALUES (?) ON CONFLICT (name) DO NOTHING", (name,))
+        return self.connection.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+
+
+def default_path() -> str:
+    """Return the path of the ledger database, following the XDG base directory spec"""
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "ynabkit", "ledger.db")
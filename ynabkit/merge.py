@@ -0,0 +1,63 @@
+import heapq
+from typing import Iterable, Iterator, List, Tuple
+
+from .models import Record
+
+
+class UnsortedSourceError(ValueError):
+    """Raised when the records of a merged source are not sorted by date"""
+
+
+def merge_sorted(sources: List[Tuple[str, Iterable[Record]]]) -> Iterator[Record]:
+    """Merge the records of several sources into a single stream sorted by date.
+
+    Each source is a (name, records) pair, where records must already be
+    sorted by date: the merge keeps one pending record per source in a heap,
+    so the memory used grows with the number of sources, not with the number
+    of records. Each record is tagged with the name of its source.
+
+    Records with the same date keep the order of the sources, then the order
+    within their source. UnsortedSourceError is raised, while iterating, as
+    soon as a source goes back in time: use in_date_order to check a source
+    before anything is merged.
+    """
+    return heapq.merge(
+        *(_tagged(name, records) for name, records in sources),
+        key=lambda record: record.date,
+    )
+
+
+def _tagged(name: str, records: Iterable[Record]) -> Iterator[Record]:
+    previous = None
+    for record in records:
+        if previous is not None and record.date < previous:
+            raise UnsortedSourceError(
+                f"{name} is not sorted by date: {record.date:%Y-%m-%d} comes after {previous:%Y-%m-%d}"
+            )
+        previous = record.date
+
+        record.source = name
+        yield record
+
+
+def in_date_order(name: str, records: Iterable[Record]) -> List[Record]:
+    """Return the records of a source oldest first, reversing them if they are newest first.
+
+    Records in any other order raise UnsortedSourceError, before any of
+    them is merged.
+    """
+    records = list(records)
+    direction = 0  # 1 oldest first, -1 newest first
+    for previous, record in zip(records, records[1:]):
+        if record.date == previous.date:
+            continue
+        step = 1 if record.date > previous.date else -1
+        if direction and step != direction:
+            raise UnsortedSourceError(
+                f"{name} is not sorted by date: {record.date:%Y-%m-%d} comes after {previous.date:%Y-%m-%d}"
+            )
+        direction = step
+
+    if direction < 0:
+        records.reverse()
+    return records
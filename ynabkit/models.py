@@ -0,0 +1,17 @@
+import dataclasses
+import datetime
+
+
+@dataclasses.dataclass
+class Record:
+    """A transaction reduced to the fields YNAB imports: date, payee, memo and amount"""
+    date: datetime.datetime
+    payee: str
+    memo: str
+    amount: int  # milliunits
+    # Name of the source the record was read from, e.g. "n26" or "fineco-account"
+    source: str = ""
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        return self.date
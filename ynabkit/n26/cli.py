@@ -0,0 +1,149 @@
+import click
+
+from ..cli import compare, describe, output_file_option, output_option, push, push_options
+from .inputs import MappedTransactionsInput, ParallelTransactionsInput, TransactionsInput
+from .outputs import TransactionsOutput
+
+
+@click.group()
+def n26():
+    "N26 related commands"
+
+
+@n26.command(name="describe-transactions")
+@click.argument(
+    "csv-file-name",
+)
+@click.option(
+    "-s",
+    "--skip-header",
+    help="Skip the header row",
+    default=True,
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json", "ofx"]),
+    default="table",
+)
+@output_option
+@output_file_option
+@click.option(
+    "-w",
+    "--workers",
+    help="Parse the file in chunks using this many worker processes",
+    type=click.IntRange(min=1),
+    default=1,
+)
+@click.option(
+    "--mmap/--no-mmap",
+    "use_mmap",
+    help="Memory-map the file and decode only the columns the output format needs",
+    default=False,
+)
+@click.pass_context
+def describe_n26_transactions(ctx: click.Context, csv_file_name: str, skip_header: bool, output_format: str, outputs: tuple, output_file: str, workers: int, use_mmap: bool):
+    "Read an .csv file containing N26 transactions and output the in a table or a CSV file"
+    payee_resolver = ctx.obj["payee_resolver"]
+    output = TransactionsOutput()
+    if use_mmap and workers > 1:
+        raise click.UsageError("--mmap and --workers cannot be used together")
+
+    if use_mmap:
+        fields = set()
+        formats = [f for f, _ in outputs]
+        if output_file or not outputs:
+            formats.append(output_format)
+        for spec_format in formats:
+            format_fields = output.fields(spec_format)
+            if format_fields is None:
+                fields = None
+                break
+            fields |= format_fields
+
+        input = MappedTransactionsInput(
+            csv_file_name,
+            skip_header=skip_header,
+            payee_resolver=payee_resolver,
+            fields=fields,
+        )
+    elif workers > 1:
+        input = ParallelTransactionsInput(
+            csv_file_name,
+            skip_header=skip_header,
+            payee_resolver=payee_resolver,
+            workers=workers,
+        )
+    else:
+        input = TransactionsInput(
+            csv_file_name,
+            skip_header=skip_header,
+            payee_resolver=payee_resolver
+        )
+    describe(
+        input,
+        output,
+        payee_resolver,
+        output_format,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+        outputs,
+        output_file,
+    )
+
+
+@n26.command(name="diff")
+@click.argument(
+    "old-file-name",
+)
+@click.argument(
+    "new-file-name",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+)
+@output_file_option
+@click.pass_context
+def diff_transactions(ctx: click.Context, old_file_name: str, new_file_name: str, output_format: str, output_file: str):
+    "Compare two exports of the same account and output the added, removed and changed transactions"
+    old_input, output = open_transactions(ctx, old_file_name)
+    new_input, _ = open_transactions(ctx, new_file_name)
+    compare(old_input, new_input, output, ctx.obj["payee_resolver"], output_format, output_file)
+
+
+@n26.command(name="push")
+@click.argument(
+    "file-name",
+)
+@push_options
+@click.pass_context
+def push_transactions(ctx: click.Context, file_name: str, budget_id: str, account_id: str, token: str, api_url: str, batch_size: int, concurrency: int, dry_run: bool):
+    "Create the transactions of an N26 export in a YNAB account through the YNAB API"
+    input, output = open_transactions(ctx, file_name)
+    push(
+        input,
+        output,
+        ctx.obj["payee_resolver"],
+        budget_id,
+        account_id,
+        token,
+        api_url,
+        batch_size,
+        concurrency,
+        dry_run,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+    )
+
+
+def open_transactions(ctx: click.Context, file_name: str):
+    """Return the input and output for an N26 export, with default reader options."""
+    return (
+        TransactionsInput(file_name, skip_header=True, payee_resolver=ctx.obj["payee_resolver"]),
+        TransactionsOutput(),
+    )
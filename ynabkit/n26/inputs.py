@@ -1,9 +1,19 @@
-from typing import List, Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Callable, Set, Tuple
 import csv
 import datetime
+import io
+import mmap
+import os
 
+from ..amounts import to_milliunits
+from .. import payee
+from ..payee import PayeeResolver
 from .models import Transaction
 
+# Size of the blocks scanned while looking for record boundaries.
+SCAN_BLOCK_SIZE = 1024 * 1024
+
 
 class TransactionsInput:
     """Read a CSV file containing N26 transactions and output a list of Transaction objects"""
@@ -15,27 +25,290 @@ class TransactionsInput:
 
     def read(self) -> List[Transaction]:
         """Read a CSV file containing N26 transactions and output a list of Transaction objects"""
-        with open(self.csv_file_name, newline='') as csvfile:
-            transactions = []
+        return list(self)
 
+    def __iter__(self) -> Iterator[Transaction]:
+        """Yield the Transaction objects one at a time, in file order"""
+        with open(self.csv_file_name, newline='') as csvfile:
             reader = csv.reader(csvfile)
             if self.skip_header:
                 next(reader)  # Skip the header row
 
-            for row in reader:
-                transactions.append(Transaction(
-                    booking_date=datetime.datetime.strptime(row[0], "%Y-%m-%d"),
-                    value_date=datetime.datetime.strptime(row[1], "%Y-%m-%d"),
-                    partner_name=row[2],
-                    partner_iban=row[3],
-                    type=row[4],
-                    payment_reference=row[5],
-                    account_name=row[6],
-                    amount_eur=float(row[7]),
-                    original_amount=float(row[8]),
-                    original_currency=row[9],
-                    exchange_rate=float(row[10]),
-                    payee=self.resolve_payee(row[2]),
-                ))
-
-            return transactions
\ No newline at end of file
+            transactions = (_parse_row(row, payee_name=None) for row in reader)
+            yield from _resolve_payees(transactions, self.resolve_payee)
+
+
+class ParallelTransactionsInput(TransactionsInput):
+    """Read a large CSV file containing N26 transactions using a pool of worker processes
+
+    The file is split in chunks at record boundaries, each chunk is parsed
+    (payees included) by a worker, and the chunks are put back together in
+    the original order.
+    """
+
+    def __init__(self, csv_file_name: str, skip_header: bool, payee_resolver: Callable[[str], str], workers: int = None):
+        super().__init__(csv_file_name, skip_header, payee_resolver)
+        self.workers = workers or os.cpu_count()
+
+    def read(self) -> List[Transaction]:
+        """Read a CSV file containing N26 transactions and output a list of Transaction objects"""
+        # A few chunks per worker keep the pool busy when chunks
+        # take different times to parse.
+        chunks = split_records(self.csv_file_name, self.workers * 4)
+        if not chunks:
+            return []
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = pool.map(
+                _read_chunk,
+                [self.csv_file_name] * len(chunks),
+                [start for start, _ in chunks],
+                [end for _, end in chunks],
+                [self.skip_header and start == 0 for start, _ in chunks],
+                [self.resolve_payee] * len(chunks),
+            )
+
+            transactions = []
+            for chunk, unresolved in results:
+                transactions.extend(chunk)
+                # The workers resolved payees on their own copy of the
+                # resolver: report their misses through ours.
+                if isinstance(self.resolve_payee, PayeeResolver):
+                    self.resolve_payee.merge_unresolved(unresolved)
+                else:
+                    for memo in unresolved:
+                        self.resolve_payee(memo)
+
+            return transactions
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Yield the Transaction objects in file order, once every chunk is parsed"""
+        return iter(self.read())
+
+
+class MappedTransactionsInput(TransactionsInput):
+    """Read a CSV file containing N26 transactions through a memory map
+
+    Field boundaries are found on the raw bytes and only the columns listed
+    in `fields` are decoded; the other fields of the transactions are left
+    to None. The payee is always resolved, so `partner_name` is always
+    decoded.
+    """
+
+    def __init__(self, csv_file_name: str, skip_header: bool, payee_resolver: Callable[[str], str], fields: Iterable[str] = None):
+        super().__init__(csv_file_name, skip_header, payee_resolver)
+        self.fields = set(fields) if fields is not None else {name for name, _ in COLUMNS}
+        self.fields.add("partner_name")
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Yield the Transaction objects one at a time, in file order"""
+        if os.path.getsize(self.csv_file_name) == 0:
+            return
+
+        columns = [
+            (index, name, parse)
+            for index, (name, parse) in enumerate(COLUMNS)
+            if name in self.fields
+        ]
+        empty = {name: None for name, _ in COLUMNS}
+
+        with open(self.csv_file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            records = _iter_records(data)
+            if self.skip_header:
+                next(records, None)  # Skip the header row
+
+            def transactions():
+                for record in records:
+                    values = dict(empty)
+                    for index, name, parse in columns:
+                        start, end, escaped = record[index]
+                        values[name] = parse(data[start:end], escaped)
+                    yield Transaction(**values, payee=None)
+
+            yield from _resolve_payees(transactions(), self.resolve_payee)
+
+
+def _iter_records(data: mmap.mmap) -> Iterator[List[Tuple[int, int, bool]]]:
+    """Yield the (start, end, escaped) byte offsets of the fields of each record.
+
+    `escaped` is True when the field is quoted and contains doubled quotes
+    that must be unescaped after decoding.
+    """
+    size = len(data)
+    position = 0
+
+    while position < size:
+        newline = data.find(b"\n", position)
+        if newline == -1:
+            newline = size
+
+        fields = []
+        while True:
+            if data[position:position + 1] == b'"':
+                cursor = position + 1
+                escaped = False
+                while True:
+                    quote = data.find(b'"', cursor)
+                    if quote == -1:
+                        raise ValueError(f"Unterminated quoted field at byte {position}")
+                    if data[quote + 1:quote + 2] != b'"':
+                        break
+                    cursor = quote + 2
+                    escaped = True
+
+                fields.append((position + 1, quote, escaped))
+                position = quote + 1
+
+                # The quoted field may have spanned several lines
+                if position > newline:
+                    newline = data.find(b"\n", position)
+                    if newline == -1:
+                        newline = size
+            else:
+                comma = data.find(b",", position, newline)
+                end = comma if comma != -1 else newline
+                if comma == -1 and end > position and data[end - 1:end] == b"\r":
+                    end -= 1
+                fields.append((position, end, False))
+                position = end
+
+            if data[position:position + 1] == b",":
+                position += 1
+                continue
+
+            # End of the record: skip the line terminator
+            if data[position:position + 1] == b"\r":
+                position += 1
+            if data[position:position + 1] == b"\n":
+                position += 1
+            break
+
+        # Skip blank lines
+        if len(fields) == 1 and fields[0][0] == fields[0][1]:
+            continue
+
+        yield fields
+
+
+def _decode(value: bytes, escaped: bool) -> str:
+    text = value.decode("utf-8")
+    return text.replace('""', '"') if escaped else text
+
+
+def _decode_date(value: bytes, escaped: bool) -> datetime.datetime:
+    return datetime.datetime.strptime(value.decode("ascii"), "%Y-%m-%d")
+
+
+def _decode_float(value: bytes, escaped: bool) -> float:
+    # float() parses ASCII bytes directly, no need to decode them
+    return float(value)
+
+
+def _decode_milliunits(value: bytes, escaped: bool) -> int:
+    return to_milliunits(value)
+
+
+# Model field and decoder of each N26 CSV column, in file order.
+COLUMNS = [
+    ("booking_date", _decode_date),
+    ("value_date", _decode_date),
+    ("partner_name", _decode),
+    ("partner_iban", _decode),
+    ("type", _decode),
+    ("payment_reference", _decode),
+    ("account_name", _decode),
+    ("amount_eur", _decode_milliunits),
+    ("original_amount", _decode_milliunits),
+    ("original_currency", _decode),
+    ("exchange_rate", _decode_float),
+]
+
+
+def split_records(csv_file_name: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a CSV file in up to `parts` byte ranges that start and end at record boundaries.
+
+    A newline is a record boundary only when it is outside a quoted field,
+    that is, when the number of quotes before it is even.
+    """
+    size = os.path.getsize(csv_file_name)
+    if size == 0:
+        return []
+
+    with open(csv_file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        boundaries = [0]
+        position = 0
+        quotes = 0
+
+        for part in range(1, parts):
+            target = size * part // parts
+            if target <= position:
+                continue
+
+            quotes += _count_quotes(data, position, target)
+            position = target
+
+            while position < size:
+                newline = data.find(b"\n", position)
+                if newline == -1:
+                    newline = size
+                quotes += _count_quotes(data, position, newline)
+                position = newline + 1
+                if quotes % 2 == 0:
+                    break
+
+            if position >= size:
+                break
+            boundaries.append(position)
+
+        boundaries.append(size)
+
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _count_quotes(data: mmap.mmap, start: int, end: int) -> int:
+    count = 0
+    for block in range(start, end, SCAN_BLOCK_SIZE):
+        count += data[block:min(block + SCAN_BLOCK_SIZE, end)].count(b'"')
+    return count
+
+
+def _read_chunk(csv_file_name: str, start: int, end: int, skip_header: bool, resolve_payee: Callable[[str], str]) -> Tuple[List[Transaction], Set[str]]:
+    """Parse the records between two byte offsets (runs in a worker process)"""
+    with open(csv_file_name, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    reader = csv.reader(io.StringIO(text, newline=''))
+    if skip_header:
+        next(reader, None)
+
+    transactions = list(_resolve_payees((_parse_row(row, payee_name=None) for row in reader), resolve_payee))
+    unresolved = {transaction.partner_name for transaction in transactions if not transaction.payee}
+
+    return transactions, unresolved
+
+
+def _resolve_payees(transactions: Iterable[Transaction], resolve_payee: Callable[[str], str]) -> Iterator[Transaction]:
+    """Set the payee of the transactions, resolving their partner names in batches"""
+    for batch in payee.batched(transactions, payee.BATCH_SIZE):
+        payees = payee.resolve_all(resolve_payee, [transaction.partner_name for transaction in batch])
+        for transaction, payee_name in zip(batch, payees):
+            transaction.payee = payee_name
+        yield from batch
+
+
+def _parse_row(row: List[str], payee_name: str) -> Transaction:
+    return Transaction(
+        booking_date=datetime.datetime.strptime(row[0], "%Y-%m-%d"),
+        value_date=datetime.datetime.strptime(row[1], "%Y-%m-%d"),
+        partner_name=row[2],
+        partner_iban=row[3],
+        type=row[4],
+        payment_reference=row[5],
+        account_name=row[6],
+        amount_eur=to_milliunits(row[7]),
+        original_amount=to_milliunits(row[8]),
+        original_currency=row[9],
+        exchange_rate=float(row[10]),
+        payee=payee_name,
+    )
@@ -11,8 +11,8 @@ class Transaction:
     type: str
     payment_reference: str
     account_name: str
-    amount_eur: float
-    original_amount: float
+    amount_eur: int  # milliunits
+    original_amount: int  # milliunits
     original_currency: str
     exchange_rate: float
     payee: str
@@ -20,3 +20,7 @@ class Transaction:
     @property
     def timestamp(self) -> datetime.datetime:
         return self.booking_date
+
+    @property
+    def kind(self) -> str:
+        return self.type
@@ -1,4 +1,7 @@
-from typing import List, Callable
+from typing import Iterable, Iterator, List, Callable, Optional, Set
+from .. import ofx
+from ..amounts import format_milliunits, from_milliunits
+from ..models import Record
 from .models import Transaction
 import io
 import json
@@ -41,8 +44,8 @@ class TransactionsOutput:
                 transaction.type,
                 transaction.payment_reference,
                 transaction.account_name,
-                str(transaction.amount_eur),
-                str(transaction.original_amount),
+                format_milliunits(transaction.amount_eur),
+                format_milliunits(transaction.original_amount),
                 transaction.original_currency,
                 str(transaction.exchange_rate),
             )
@@ -64,12 +67,12 @@ class TransactionsOutput:
         
         writer = csv.writer(output)
         writer.writerow(["Date", "Payee", "Memo", "Amount"])
-        for transaction in transactions:
+        for record in self.records(transactions):
             writer.writerow([
-                transaction.booking_date.strftime("%m/%d/%Y"),
-                transaction.payee,
-                transaction.partner_name,
-                str(transaction.amount_eur),
+                record.date.strftime("%m/%d/%Y"),
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
             ])
         
         return output.getvalue()        
@@ -78,6 +81,27 @@ class TransactionsOutput:
         """Output the transactions as a JSON string"""
         return json.dumps(transactions, cls=TransactionEncoder, indent=4)
 
+    def ofx(self, transactions: List[Transaction]) -> Iterator[str]:
+        """Output the transactions as an OFX statement, one chunk at a time"""
+        start, end = ofx.date_range(self.records(transactions))
+        return ofx.statement(self.records(transactions), start, end)
+
+    def fields(self, output_format: str) -> Optional[Set[str]]:
+        """Transaction fields read by an output format, or None if it reads all of them"""
+        if output_format in ("csv", "ofx"):
+            return {"booking_date", "partner_name", "amount_eur", "payee"}
+        return None
+
+    def records(self, transactions: Iterable[Transaction]) -> Iterator[Record]:
+        """Map the transactions to the fields YNAB imports"""
+        for transaction in transactions:
+            yield Record(
+                date=transaction.booking_date,
+                payee=transaction.payee,
+                memo=transaction.partner_name,
+                amount=transaction.amount_eur,
+            )
+
 class TransactionEncoder(json.JSONEncoder):
     def default(self, obj):
         return {
@@ -88,8 +112,8 @@ class TransactionEncoder(json.JSONEncoder):
             "type": obj.type,
             "payment_reference": obj.payment_reference,
             "account_name": obj.account_name,
-            "amount_eur": obj.amount_eur,
-            "original_amount": obj.original_amount,
+            "amount_eur": from_milliunits(obj.amount_eur),
+            "original_amount": from_milliunits(obj.original_amount),
             "original_currency": obj.original_currency,
             "exchange_rate": obj.exchange_rate,
             "payee": obj.payee,
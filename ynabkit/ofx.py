@@ -0,0 +1,150 @@
+import datetime
+import hashlib
+from typing import Iterable, Iterator, Tuple
+from xml.sax.saxutils import escape
+
+from .amounts import format_milliunits
+from .models import Record
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>
+<OFX>
+<SIGNONMSGSRSV1>
+<SONRS>
+<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>
+<DTSERVER>{now}</DTSERVER>
+<LANGUAGE>ENG</LANGUAGE>
+</SONRS>
+</SIGNONMSGSRSV1>
+<BANKMSGSRSV1>
+<STMTTRNRS>
+<TRNUID>0</TRNUID>
+<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>
+<STMTRS>
+<CURDEF>{currency}</CURDEF>
+<BANKACCTFROM>
+<BANKID>ynabkit</BANKID>
+<ACCTID>{account_id}</ACCTID>
+<ACCTTYPE>CHECKING</ACCTTYPE>
+</BANKACCTFROM>
+<BANKTRANLIST>
+<DTSTART>{start}</DTSTART>
+<DTEND>{end}</DTEND>
+"""
+
+TRANSACTION = """<STMTTRN>
+<TRNTYPE>{type}</TRNTYPE>
+<DTPOSTED>{date}</DTPOSTED>
+<TRNAMT>{amount}</TRNAMT>
+<FITID>{fitid}</FITID>
+<NAME>{name}</NAME>
+<MEMO>{memo}</MEMO>
+</STMTTRN>
+"""
+
+FOOTER = """</BANKTRANLIST>
+<LEDGERBAL>
+<BALAMT>0.00</BALAMT>
+<DTASOF>{end}</DTASOF>
+</LEDGERBAL>
+</STMTRS>
+</STMTTRNRS>
+</BANKMSGSRSV1>
+</OFX>
+"""
+
+# OFX limits NAME to 32 characters.
+NAME_MAX_LENGTH = 32
+
+
+def date_range(records: Iterable[Record]) -> Tuple[datetime.datetime, datetime.datetime]:
+    """Return the earliest and latest date of the records, or today if there are none."""
+    start = end = None
+    for record in records:
+        if start is None or record.date < start:
+            start = record.date
+        if end is None or record.date > end:
+            end = record.date
+
+    if start is None:
+        start = end = datetime.datetime.combine(datetime.date.today(), datetime.time())
+
+    return start, end
+
+
+def statement(
+    records: Iterable[Record],
+    start: datetime.datetime,
+    end: datetime.datetime,
+    currency: str = "EUR",
+    account_id: str = "ynabkit",
+) -> Iterator[str]:
+    """Render the records as an OFX statement, one chunk at a time.
+
+    Each STMTTRN is yielded as soon as its record is read, so the memory
+    used does not depend on the length of the statement. The records must
+    be sorted by date (see FITIDGenerator).
+    """
+    yield HEADER.format(
+        now=_format_date(datetime.datetime.now()),
+        currency=escape(currency),
+        account_id=escape(account_id),
+        start=_format_date(start),
+        end=_format_date(end),
+    )
+
+    fitids = FITIDGenerator()
+    for record in records:
+        yield TRANSACTION.format(
+            type="CREDIT" if record.amount > 0 else "DEBIT",
+            date=_format_date(record.date),
+            amount=format_milliunits(record.amount),
+            fitid=fitids(record),
+            name=escape((record.payee or record.memo or "")[:NAME_MAX_LENGTH]),
+            memo=escape(record.memo or ""),
+        )
+
+    yield FOOTER.format(end=_format_date(end))
+
+
+class FITIDGenerator:
+    """Generate stable FITIDs from the date, amount and memo of a record.
+
+    The payee is left out on purpose: editing payees.yml must not change
+    the ID of a transaction YNAB already imported.
+
+    Identical records on the same day (two coffees at the same bar) get an
+    occurrence suffix. Only the occurrences of the current day are kept, so
+    memory stays constant on statements sorted by date, oldest or newest
+    first; records in any other order raise ValueError, as the occurrences
+    of a day coming back would be lost.
+    """
+
+    def __init__(self):
+        self._day = None
+        self._direction = 0  # 1 oldest first, -1 newest first
+        self._occurrences = {}
+
+    def __call__(self, record: Record) -> str:
+        day = record.date.date()
+        if day != self._day:
+            if self._day is not None:
+                direction = 1 if day > self._day else -1
+                if self._direction and direction != self._direction:
+                    raise ValueError(f"Records are not sorted by date: {day.isoformat()} comes after {self._day.isoformat()}")
+                self._direction = direction
+            self._day = day
+            self._occurrences = {}
+
+        digest = hashlib.sha1(
+            f"{day.isoformat()}|{format_milliunits(record.amount)}|{record.memo}".encode("utf-8")
+        ).hexdigest()[:24]
+
+        occurrence = self._occurrences.get(digest, 0)
+        self._occurrences[digest] = occurrence + 1
+
+        return digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+
+def _format_date(value: datetime.datetime) -> str:
+    return value.strftime("%Y%m%d%H%M%S")
@@ -0,0 +1,229 @@
+import csv
+import datetime
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from .amounts import format_milliunits, from_milliunits
+from .diff import Change
+from .models import Record
+from .payee import pattern_for
+
+
+class RecordsOutput:
+    """Output Record objects from any source in a table, CSV or JSON file"""
+
+    def table(self, records: Iterable[Record]) -> str:
+        """Renders the records as a table."""
+        console = Console(file=io.StringIO())
+
+        table = Table(
+            title="Transactions",
+        )
+
+        table.add_column("Date")
+        table.add_column("Source")
+        table.add_column("Payee")
+        table.add_column("Memo")
+        table.add_column("Amount")
+
+        count = 0
+        for record in records:
+            count += 1
+            table.add_row(
+                record.date.strftime("%Y-%m-%d"),
+                record.source,
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
+            )
+
+        console.print(f"Found {count} transactions")
+        console.print(table)
+
+        return console.file.getvalue()
+
+    def csv(self, records: Iterable[Record]) -> str:
+        """Renders the records as a CSV string.
+
+        It produces CSV using the YNAB format, plus a trailing Source column.
+        See https://docs.youneedabudget.com/article/921-formatting-csv-file
+        to learn more about the format.
+        """
+        return "".join(self.iter_csv(records))
+
+    def iter_csv(self, records: Iterable[Record]) -> Iterator[str]:
+        """Renders the records as CSV, one line at a time."""
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        def line(row: list) -> str:
+            output.seek(0)
+            output.truncate()
+            writer.writerow(row)
+            return output.getvalue()
+
+        yield line(["Date", "Payee", "Memo", "Amount", "Source"])
+        for record in records:
+            yield line([
+                record.date.strftime("%m/%d/%Y"),
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
+                record.source,
+            ])
+
+    def json(self, records: Iterable[Record]) -> str:
+        """Renders the records as a JSON string."""
+        return "".join(self.iter_json(records))
+
+    def iter_json(self, records: Iterable[Record]) -> Iterator[str]:
+        """Renders the records as a JSON array, one record at a time.
+
+        The chunks join into the same text json.dumps(..., indent=4) returns.
+        """
+        encoder = RecordEncoder(indent=4)
+        separator = "[\n"
+        for record in records:
+            yield separator + "\n".join("    " + line for line in encoder.encode(record).split("\n"))
+            separator = ",\n"
+
+        yield "[]" if separator == "[\n" else "\n]"
+
+
+class SuggestionsOutput:
+    """Output the payees suggested for unresolved memos in a table or as payees.yml entries"""
+
+    def table(self, suggestions: Dict[str, List[Tuple[str, float]]]) -> str:
+        """Renders the suggestions as a table."""
+        console = Console(file=io.StringIO())
+
+        console.print(f"Found {len(suggestions)} unresolved memos")
+
+        table = Table(
+            title="Payee suggestions",
+        )
+
+        table.add_column("Memo")
+        table.add_column("Payee")
+        table.add_column("Score")
+
+        for memo, candidates in suggestions.items():
+            if not candidates:
+                table.add_row(memo, "", "")
+            for rank, (payee, score) in enumerate(candidates):
+                table.add_row(memo if rank == 0 else "", payee, f"{score:.2f}")
+
+        console.print(table)
+
+        return console.file.getvalue()
+
+    def yaml(self, suggestions: Dict[str, List[Tuple[str, float]]]) -> str:
+        """Renders the best suggestion for each memo as payees.yml entries, ready to paste."""
+        patterns = {}
+        for memo, candidates in suggestions.items():
+            if candidates:
+                payee, _ = candidates[0]
+                patterns.setdefault(payee, []).append(pattern_for(memo))
+
+        if not patterns:
+            return ""
+
+        return yaml.safe_dump(
+            [dict(name=payee, patterns=memos) for payee, memos in patterns.items()],
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+
+class ChangesOutput:
+    """Output the changes between two exports in a table, CSV or JSON file"""
+
+    def table(self, changes: Iterable[Change]) -> str:
+        """Renders the changes as a table."""
+        console = Console(file=io.StringIO())
+
+        table = Table(
+            title="Changes",
+        )
+
+        table.add_column("Status")
+        table.add_column("Date")
+        table.add_column("Payee")
+        table.add_column("Memo")
+        table.add_column("Amount")
+        table.add_column("Changes")
+
+        count = 0
+        for change in changes:
+            count += 1
+            table.add_row(
+                change.status,
+                change.record.date.strftime("%Y-%m-%d"),
+                change.record.payee,
+                change.record.memo,
+                format_milliunits(change.record.amount),
+                _describe_fields(change),
+            )
+
+        console.print(f"Found {count} changes")
+        console.print(table)
+
+        return console.file.getvalue()
+
+    def csv(self, changes: Iterable[Change]) -> str:
+        """Renders the changes as a CSV string."""
+        output = io.StringIO()
+
+        writer = csv.writer(output)
+        writer.writerow(["Status", "Date", "Payee", "Memo", "Amount", "Changes"])
+        for change in changes:
+            writer.writerow([
+                change.status,
+                change.record.date.strftime("%m/%d/%Y"),
+                change.record.payee,
+                change.record.memo,
+                format_milliunits(change.record.amount),
+                _describe_fields(change),
+            ])
+
+        return output.getvalue()
+
+    def json(self, changes: Iterable[Change]) -> str:
+        """Renders the changes as a JSON string."""
+        return json.dumps(list(changes), cls=ChangeEncoder, indent=4)
+
+
+def _describe_fields(change: Change) -> str:
+    return "; ".join(f"{name}: {old} → {new}" for name, (old, new) in change.fields.items())
+
+
+class ChangeEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Change):
+            return {
+                "status": obj.status,
+                "date": obj.record.date.isoformat(),
+                "payee": obj.record.payee if obj.record.payee else None,
+                "memo": obj.record.memo,
+                "amount": from_milliunits(obj.record.amount),
+                "changes": {name: {"old": old, "new": new} for name, (old, new) in obj.fields.items()},
+            }
+        if isinstance(obj, (datetime.date, datetime.datetime)):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+class RecordEncoder(json.JSONEncoder):
+    def default(self, obj: Record):
+        return {
+            "date": obj.date.isoformat(),
+            "source": obj.source,
+            "payee": obj.payee if obj.payee else None,
+            "memo": obj.memo,
+            "amount": from_milliunits(obj.amount),
+        }
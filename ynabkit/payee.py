@@ -1,34 +1,334 @@
+import bisect
+import heapq
+import itertools
 import re
-from typing import Dict, List, Set
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Memos the readers resolve together, so that resolve_many has enough of
+# them to spread across worker processes.
+BATCH_SIZE = 10_000
+
+# Below this many distinct memos, resolve_many resolves them in-process:
+# shipping them to the workers and back costs more than it saves. See
+# benchmarks/payee_parallel.py to measure the crossover on a machine.
+PARALLEL_MIN_MEMOS = 2_000
 
 
 class PayeeResolver:
+    """Resolve memos to payee names using the mappings in payees.yml.
+
+    Each payee can list `exact` memos, matched after case folding and
+    whitespace normalisation, `prefix` memos, matched the same way at the
+    start of the memo (keeping a trailing space, to match whole words),
+    and regex `patterns`. Payees are tried in order and the first one
+    matching wins, but exact and prefix matches are found
+    through a dict and a sorted prefix index: regex patterns are searched
+    only for the payees listed before the best exact or prefix match.
+
+    With `workers` > 1, resolve_many resolves large batches of distinct
+    memos in a pool of worker processes, started on first use with their
+    own copy of the mappings. Call close() to stop them.
+    """
 
-    def __init__(self):
+    def __init__(self, workers: int = 1, min_parallel: int = PARALLEL_MIN_MEMOS):
+        self.workers = workers
+        self.min_parallel = min_parallel
         self.mappings = []
+        self._raw_mappings = []
+        self._pool = None
         self._unresolved = set()
+        self._exact: Dict[str, int] = {}
+        self._prefixes: List[str] = []
+        # For each prefix, the index of the previous prefix in _prefixes it
+        # starts with (-1 if none) and the lowest payee index among the
+        # prefix and the prefixes it starts with.
+        self._prefix_parents: List[int] = []
+        self._prefix_payees: List[int] = []
 
     def load_mappings(self, mappings: List[Dict[str, List[str]]]):
+        self.close()  # the workers would keep the old mappings
+        self._raw_mappings = mappings
         self.mappings = [
             dict(
                 name=payee["name"],
-                patterns=[re.compile(pattern, re.IGNORECASE) for pattern in payee["patterns"]]
+                patterns=[re.compile(pattern, re.IGNORECASE) for pattern in payee.get("patterns") or []]
             )
             for payee in mappings
         ]
 
+        self._exact = {}
+        prefixes = {}
+        for index, payee in enumerate(mappings):
+            for memo in payee.get("exact") or []:
+                self._exact.setdefault(normalize(memo), index)
+            for memo in payee.get("prefix") or []:
+                prefixes.setdefault(normalize_prefix(memo), index)
+
+        self._prefixes = sorted(prefixes)
+        self._prefix_parents = []
+        self._prefix_payees = []
+        for i, prefix in enumerate(self._prefixes):
+            parent = self._find_prefix(prefix, i - 1)
+            self._prefix_parents.append(parent)
+            self._prefix_payees.append(
+                min(prefixes[prefix], self._prefix_payees[parent]) if parent >= 0 else prefixes[prefix]
+            )
+
     def __call__(self, memo: str) -> str:
         """Resolve a memo to a payee name"""
-        for payee in self.mappings:
+        key = normalize(memo)
+        best = min(
+            self._exact.get(key, len(self.mappings)),
+            self._match_prefix(key),
+        )
+
+        for payee in itertools.islice(self.mappings, best):
             if any(pattern.search(memo) for pattern in payee["patterns"]):
                 return payee["name"]
-        
+
+        if best < len(self.mappings):
+            return self.mappings[best]["name"]
+
         # Keep track of unresolved memos
         self._unresolved.add(memo)
         
         return ""
 
+    def resolve_many(self, memos: Sequence[str]) -> List[str]:
+        """Resolve several memos at once, each distinct memo only once"""
+        distinct = list(dict.fromkeys(memos))
+
+        if self.workers > 1 and len(distinct) >= self.min_parallel:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_start_worker,
+                    initargs=(self._raw_mappings,),
+                )
+            # A few chunks per worker keep the pool busy when chunks take
+            # different times to resolve
+            size = -(-len(distinct) // (self.workers * 4))
+            payees = []
+            for chunk_payees, unresolved in self._pool.map(_resolve_chunk, batched(distinct, size)):
+                payees.extend(chunk_payees)
+                self.merge_unresolved(unresolved)
+        else:
+            payees = [self(memo) for memo in distinct]
+
+        resolved = dict(zip(distinct, payees))
+        return [resolved[memo] for memo in memos]
+
+    def close(self):
+        """Stop the worker processes, if any were started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __getstate__(self):
+        # A copy sent to another process resolves in that process
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["workers"] = 1
+        return state
+
+    def _match_prefix(self, key: str) -> int:
+        """Return the lowest payee index among the prefixes key starts with, or len(mappings)"""
+        found = self._find_prefix(key, bisect.bisect_right(self._prefixes, key) - 1)
+        return self._prefix_payees[found] if found >= 0 else len(self.mappings)
+
+    def _find_prefix(self, key: str, i: int) -> int:
+        """Return the index of the longest prefix of key in _prefixes[:i + 1], or -1.
+
+        _prefixes[i] is the greatest candidate not after key: every prefix
+        of key sorting before it is also one of its prefixes, so the search
+        follows the chain of its parents.
+        """
+        while i >= 0 and not key.startswith(self._prefixes[i]):
+            i = self._prefix_parents[i]
+        return i
+
+    def merge_unresolved(self, memos: Iterable[str]):
+        """Add memos left unresolved by another copy of this resolver (e.g. in a worker process)"""
+        self._unresolved.update(memos)
+
     @property
     def unresolved(self) -> Set[str]:
         """Get a list of unresolved memos"""
         return self._unresolved.copy()
+
+
+# The resolver of a worker process of PayeeResolver.resolve_many
+_worker_resolver = None
+
+
+def _start_worker(mappings: List[Dict[str, List[str]]]):
+    global _worker_resolver
+    _worker_resolver = PayeeResolver()
+    _worker_resolver.load_mappings(mappings)
+
+
+def _resolve_chunk(memos: List[str]) -> Tuple[List[str], List[str]]:
+    """Resolve memos in a worker process, returning the payees and the unresolved memos"""
+    payees = [_worker_resolver(memo) for memo in memos]
+    # The parent collects the unresolved memos from the return value
+    _worker_resolver._unresolved.clear()
+    return payees, [memo for memo, payee in zip(memos, payees) if not payee]
+
+
+def resolve_all(resolve_payee: Callable[[str], str], memos: Sequence[str]) -> List[str]:
+    """Resolve memos through resolve_many if resolve_payee has it, one at a time otherwise"""
+    if isinstance(resolve_payee, PayeeResolver):
+        return resolve_payee.resolve_many(memos)
+    return [resolve_payee(memo) for memo in memos]
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split items in lists of at most size items"""
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def changed_payees(old: List[Dict[str, List[str]]], new: List[Dict[str, List[str]]]) -> Optional[Set[str]]:
+    """Return the names of the payees added, removed or edited between two mappings.
+
+    Return None if the payees left unchanged are not in the same order any
+    more: then any memo may resolve to a different payee.
+    """
+    old_entries = defaultdict(list)
+    for entry in old:
+        old_entries[entry["name"]].append(entry)
+    new_entries = defaultdict(list)
+    for entry in new:
+        new_entries[entry["name"]].append(entry)
+
+    changed = {name for name in old_entries.keys() | new_entries.keys() if old_entries.get(name) != new_entries.get(name)}
+
+    if [e["name"] for e in old if e["name"] not in changed] != [e["name"] for e in new if e["name"] not in changed]:
+        return None
+    return changed
+
+
+def reresolve(resolutions: Dict[str, str], old: Optional[List[Dict[str, List[str]]]], new: List[Dict[str, List[str]]]) -> Dict[str, str]:
+    """Return the memos resolving to a different payee with the new mappings, with their new payee.
+
+    resolutions maps memos to the payee ("" if none) they resolved to with
+    the old mappings, or None if they are not known. Only the memos whose
+    outcome could change are resolved again: those of a payee that was
+    edited or removed, and those a changed payee listed before the old one
+    (or any changed payee, for unresolved memos) now matches. The unchanged
+    payees before the old one did not match them, and still do not.
+    """
+    changed = changed_payees(old, new) if old is not None else None
+
+    resolver = PayeeResolver()
+    resolver.load_mappings(new)
+    if changed is None:
+        candidates = list(resolutions)
+    else:
+        # The index of the last entry of each payee: a changed payee before
+        # it may now match the memos it resolved
+        last = {entry["name"]: index for index, entry in enumerate(new)}
+        first = {}
+        for index, entry in enumerate(new):
+            first.setdefault(entry["name"], index)
+
+        changed_resolver = PayeeResolver()
+        changed_resolver.load_mappings([entry for entry in new if entry["name"] in changed])
+
+        candidates = []
+        for memo, payee in resolutions.items():
+            if payee in changed or (payee and payee not in last):
+                candidates.append(memo)
+                continue
+            match = changed_resolver(memo)
+            if match and (not payee or first[match] < last[payee]):
+                candidates.append(memo)
+
+    payees = resolver.resolve_many(candidates)
+    return {memo: payee for memo, payee in zip(candidates, payees) if payee != resolutions[memo]}
+
+
+class PayeeSuggester:
+    """Suggest payees for unresolved memos, looking for similar memos that already resolve.
+
+    Memos are indexed by their trigrams. To rank the payees for a memo only
+    the memos sharing at least one trigram with it are looked at, and
+    trigrams shared by more than `max_postings` memos (like "pag" in
+    "PAGAMENTO") are not used to find candidates, so the cost of a query
+    does not grow with the number of indexed memos.
+    """
+
+    def __init__(self, max_postings: int = 500, max_candidates: int = 50):
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self._memos: List[Tuple[str, frozenset]] = []  # (payee, trigrams)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._seen: Set[Tuple[frozenset, str]] = set()
+
+    def add(self, memo: str, payee: str):
+        """Index a memo that resolves to payee"""
+        grams = trigrams(memo)
+        if (grams, payee) in self._seen:
+            return
+        self._seen.add((grams, payee))
+
+        memo_id = len(self._memos)
+        self._memos.append((payee, grams))
+        for gram in grams:
+            self._postings[gram].append(memo_id)
+
+    def suggest(self, memo: str, limit: int = 3, min_score: float = 0.3) -> List[Tuple[str, float]]:
+        """Return up to `limit` (payee, score) pairs for a memo, best first.
+
+        The score is the Dice coefficient between the trigrams of the memo
+        and those of the most similar indexed memo of each payee.
+        """
+        grams = trigrams(memo)
+        if not grams:
+            return []
+
+        shared = defaultdict(int)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings and len(postings) <= self.max_postings:
+                for memo_id in postings:
+                    shared[memo_id] += 1
+
+        scores = {}
+        for memo_id in heapq.nlargest(self.max_candidates, shared, key=shared.get):
+            payee, candidate = self._memos[memo_id]
+            score = 2 * len(grams & candidate) / (len(grams) + len(candidate))
+            if score >= min_score and score > scores.get(payee, 0):
+                scores[payee] = score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def normalize(memo: str) -> str:
+    """Return the memo case folded, with runs of whitespace collapsed to a single space"""
+    return " ".join((memo or "").split()).casefold()
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Return the prefix normalised like a memo, keeping a trailing space so "BAR ROMA " does not match BAR ROMANO"""
+    key = normalize(prefix)
+    if key and prefix[-1].isspace():
+        key += " "
+    return key
+
+
+def trigrams(memo: str) -> frozenset:
+    """Return the trigrams of a memo, normalised to ignore case, digits and extra whitespace"""
+    text = " ".join(re.sub(r"\d+", "0", memo or "").casefold().split())
+    if not text:
+        return frozenset()
+    text = f"  {text} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def pattern_for(memo: str) -> str:
+    """Return a pattern for payees.yml matching the memo literally"""
+    return re.escape(memo).replace("\\ ", " ")
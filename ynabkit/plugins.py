@@ -0,0 +1,61 @@
+import functools
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Dict, List
+
+# Entry point group of the bank plugins: each entry point names a click
+# group, added to the CLI as a subcommand named after the entry point.
+BANKS = "ynabkit.banks"
+
+# Entry point group of the sources accepted by the commands working across
+# banks (ingest, query, merge, payees suggest): each entry point names a
+# function taking the click context and a file name, and returning the
+# (input, output) pair reading that file.
+SOURCES = "ynabkit.sources"
+
+# The plugins shipped with ynabkit, also declared in setup.py. They are
+# registered here too, so that they are found when ynabkit runs from a
+# checkout that is not installed.
+BUILTIN = {
+    BANKS: {
+        "fineco": "ynabkit.fineco.cli:fineco",
+        "n26": "ynabkit.n26.cli:n26",
+        "satispay": "ynabkit.satispay.cli:satispay",
+    },
+    SOURCES: {
+        "fineco-account": "ynabkit.fineco.cli:open_account",
+        "fineco-card": "ynabkit.fineco.cli:open_card",
+        "n26": "ynabkit.n26.cli:open_transactions",
+        "satispay": "ynabkit.satispay.cli:open_transactions",
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def registered(group: str) -> Dict[str, EntryPoint]:
+    """Return the entry points of group by name, without importing them.
+
+    Installed plugins replace the built-in ones with the same name.
+    """
+    found = {
+        name: EntryPoint(name=name, value=value, group=group)
+        for name, value in BUILTIN.get(group, {}).items()
+    }
+    for entry_point in entry_points(group=group):
+        found[entry_point.name] = entry_point
+
+    return found
+
+
+def names(group: str) -> List[str]:
+    """Return the sorted names of the plugins in group"""
+    return sorted(registered(group))
+
+
+def load(group: str, name: str) -> Any:
+    """Import the plugin registered as name in group and return it"""
+    try:
+        entry_point = registered(group)[name]
+    except KeyError:
+        raise KeyError(f"No plugin {name!r} in {group}") from None
+
+    return entry_point.load()
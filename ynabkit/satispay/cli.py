@@ -0,0 +1,114 @@
+import click
+
+from ..cli import compare, describe, engine_option, output_file_option, output_option, push, push_options
+from .inputs import TransactionsInput
+from .outputs import TransactionsOutput
+
+
+@click.group()
+def satispay():
+    "Satispay related commands"
+
+
+@satispay.command(name="describe-transactions")
+@click.argument(
+    "excel-file-name",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json", "ofx"]),
+    default="table",
+)
+@output_option
+@output_file_option
+@click.option(
+    "-e",
+    "--exclude-kinds",
+    help="Exclude kinds",
+    type=click.Choice([
+        "🏦 From Bank",
+        "🏬 to a Store",
+        "👤 to Person",
+        "👤 from Person",
+        "📱 Mobile Top-up",
+    ]),
+    default=None,
+)
+@engine_option
+@click.pass_context
+def describe_transactions(ctx: click.Context, excel_file_name: str, output_format: str, outputs: tuple, output_file: str, exclude_kinds: str = None, engine: str = "openpyxl"):
+    "Read an .xlsx file containing credit card transactions and output the in a table or a CSV file"
+    payee_resolver = ctx.obj["payee_resolver"]
+    describe(
+        TransactionsInput(
+            excel_file_name,
+            exclude_kinds=exclude_kinds,
+            payee_resolver=payee_resolver,
+            engine=engine,
+        ),
+        TransactionsOutput(),
+        payee_resolver,
+        output_format,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+        outputs,
+        output_file,
+    )
+
+
+@satispay.command(name="diff")
+@click.argument(
+    "old-file-name",
+)
+@click.argument(
+    "new-file-name",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    help="Output format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+)
+@output_file_option
+@click.pass_context
+def diff_transactions(ctx: click.Context, old_file_name: str, new_file_name: str, output_format: str, output_file: str):
+    "Compare two exports of the same account and output the added, removed and changed transactions"
+    old_input, output = open_transactions(ctx, old_file_name)
+    new_input, _ = open_transactions(ctx, new_file_name)
+    compare(old_input, new_input, output, ctx.obj["payee_resolver"], output_format, output_file)
+
+
+@satispay.command(name="push")
+@click.argument(
+    "file-name",
+)
+@push_options
+@click.pass_context
+def push_transactions(ctx: click.Context, file_name: str, budget_id: str, account_id: str, token: str, api_url: str, batch_size: int, concurrency: int, dry_run: bool):
+    "Create the transactions of a Satispay export in a YNAB account through the YNAB API"
+    input, output = open_transactions(ctx, file_name)
+    push(
+        input,
+        output,
+        ctx.obj["payee_resolver"],
+        budget_id,
+        account_id,
+        token,
+        api_url,
+        batch_size,
+        concurrency,
+        dry_run,
+        ctx.obj.get("start_date"),
+        ctx.obj.get("end_date"),
+    )
+
+
+def open_transactions(ctx: click.Context, file_name: str):
+    """Return the input and output for a Satispay export, with default reader options."""
+    return (
+        TransactionsInput(file_name, payee_resolver=ctx.obj["payee_resolver"]),
+        TransactionsOutput(),
+    )
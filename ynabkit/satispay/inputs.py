@@ -1,28 +1,133 @@
-from typing import List, Callable
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
 import datetime
+import itertools
+import re
 
-from openpyxl import load_workbook
-
+from ..amounts import to_milliunits
+from ..payee import BATCH_SIZE, batched, resolve_all
+from ..xlsx import read_rows
 from .models import Transaction
 
+# Number of rows used to detect the date and amount formats of a file.
+SAMPLE_ROWS = 20
+
+
+class FormatSniffer:
+    """Parse string values with a format detected from a sample of the file.
+
+    The detected format is locked in, so each value costs a single parse
+    with no exception raised. Only when a value does not fit the locked
+    format the sniffer detects the format again, from that value.
+
+    Values that are not strings (e.g. cells the xlsx engine already converted to
+    datetime or float) are returned as they are.
+    """
+
+    def __init__(self, formats: List[Tuple[str, Callable[[str], Any]]]):
+        self.formats = formats
+        self.format = formats[0]
+
+    def detect(self, samples: Iterable[Any]):
+        """Lock in the first format that parses every string in samples"""
+        samples = [sample for sample in samples if isinstance(sample, str)]
+        if not samples:
+            return
+
+        for candidate in self.formats:
+            if all(self._parses(candidate, sample) for sample in samples):
+                self.format = candidate
+                return
+
+    def __call__(self, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return self.format[1](value)
+        except ValueError:
+            pass
+
+        for candidate in self.formats:
+            if candidate is not self.format and self._parses(candidate, value):
+                self.format = candidate
+                return candidate[1](value)
+
+        raise ValueError(f"Could not parse {value!r}: expected one of {', '.join(name for name, _ in self.formats)}")
+
+    @staticmethod
+    def _parses(candidate: Tuple[str, Callable[[str], Any]], value: str) -> bool:
+        try:
+            candidate[1](value)
+            return True
+        except ValueError:
+            return False
+
+
+def _date_format(date_format: str) -> Tuple[str, Callable[[str], datetime.datetime]]:
+    return date_format, lambda value: datetime.datetime.strptime(value, date_format)
+
+
+def _amount_format(name: str, pattern: str, thousands: str, decimal: str) -> Tuple[str, Callable[[str], int]]:
+    regex = re.compile(pattern)
+
+    def parse(value: str) -> int:
+        value = value.replace("€", "").replace(" ", "").strip()
+        if not regex.fullmatch(value):
+            raise ValueError(f"{value!r} is not a {name} amount")
+        return to_milliunits(value.replace(thousands, "").replace(decimal, "."))
+
+    return name, parse
+
+
+# Date formats found in Satispay exports, most common first.
+DATE_FORMATS = [
+    _date_format('%d %b %Y at %I:%M:%S %p'),
+    _date_format('%d %b %Y at %H:%M:%S'),
+]
+
+# Amount formats, e.g. "-1.234,56" (Italian) and "-1,234.56" (English),
+# parsed to milliunits.
+# The thousands separator is optional, so "-12,4" and "-12.4" both fit.
+AMOUNT_FORMATS = [
+    _amount_format("1.234,56", r"[+-]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?", ".", ","),
+    _amount_format("1,234.56", r"[+-]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?", ",", "."),
+]
+
 
 class TransactionsInput:
 
-    def __init__(self, excel_file: str, payee_resolver: Callable[[str], str], exclude_kinds: List[str] = None):
+    def __init__(self, excel_file: str, payee_resolver: Callable[[str], str], exclude_kinds: List[str] = None, engine: str = "openpyxl"):
         self.excel_file = excel_file
         self.exclude_kinds = exclude_kinds
         self.payee_resolver = payee_resolver
+        self.engine = engine
+        self._parse_date = FormatSniffer(DATE_FORMATS)
+        self._parse_amount = FormatSniffer(AMOUNT_FORMATS)
 
     def read(self) -> List[Transaction]:
         """Read a credit card statement and output a list of Transaction objects"""
-        # Open the workbook
-        workbook = load_workbook(filename=self.excel_file)
-        ws = workbook.active
+        return list(self)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Yield the Transaction objects one at a time, in file order"""
+        rows = iter(read_rows(self.excel_file, min_row=2, max_col=8, engine=self.engine))
+
+        # Detect the date and amount formats from the first rows
+        sample = list(itertools.islice(rows, SAMPLE_ROWS))
+        self._parse_date.detect(row[0] for row in sample)
+        self._parse_amount.detect(row[3] for row in sample)
+
+        for batch in batched(self._parse(itertools.chain(sample, rows)), BATCH_SIZE):
+            payees = resolve_all(self.payee_resolver, [transaction.name for transaction in batch])
+            for transaction, payee in zip(batch, payees):
+                transaction.payee = payee
+            yield from batch
 
-        transactions = []
-        for row in ws.iter_rows(min_row=2, max_col=8):
+    def _parse(self, rows: Iterable[tuple]) -> Iterator[Transaction]:
+        """Parse the rows into Transaction objects, payee excluded"""
+        for row in rows:
             # Skip if the kind is in the exclude list
-            if self.exclude_kinds and row[4].value in self.exclude_kinds:
+            if self.exclude_kinds and row[4] in self.exclude_kinds:
                 continue
 
             # Fields:
@@ -37,49 +142,19 @@ class TransactionsInput:
             # 7: Balance after transaction
             # 8: ID (not available)
             # ------------------------------------------------------------
-            
-            t = Transaction(
-                name=row[1].value,
-                state=row[5].value,
-                kind=row[4].value,
-                date=row[0].value,
-                amount=row[3].value,
-                payee=self.payee_resolver(row[1].value),
-            )
 
-            transactions.append(t)
-        return transactions
-
-    def _parse_date(self, date_str: str) -> datetime.date:
-        # try one of the following date formats
-        date_formats = [
-            '%d %b %Y at %I:%M:%S %p',
-            '%d %b %Y at %H:%M:%S',
-        ]
-        for date_format in date_formats:
-            try:
-                return datetime.datetime.strptime(date_str, date_format)
-            except ValueError:
-                pass
-
-        raise ValueError(f"Could not parse date {date_str}")
-
-    def _parse_amount(self, amount_str: str) -> float:
-        """
-        Parse string amounts like "+40" or "-12,4" to float
-        
-        Args:
-            amount_str: String representation of amount (e.g., "+40", "-12,4")
-            
-        Returns:
-            float: The parsed amount
-            
-        Examples:
-            >>> parse_amount("+40")
-            40.0
-            >>> parse_amount("-12,4")
-            -12.4
-            >>> parse_amount("1.234,56")
-            1234.56        
-        """
-        return float(amount_str.replace(".", "").replace(",", "."))
+            # The xlsx engine already converted numeric cells
+            amount = row[3]
+            if isinstance(amount, (int, float)):
+                amount = to_milliunits(amount)
+            else:
+                amount = self._parse_amount(amount)
+
+            yield Transaction(
+                name=row[1],
+                state=row[5],
+                kind=row[4],
+                date=self._parse_date(row[0]),
+                amount=amount,
+                payee=None,
+            )
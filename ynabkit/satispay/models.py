@@ -9,7 +9,7 @@ class Transaction:
     state: str
     kind: str
     date: datetime.datetime
-    amount: float
+    amount: int  # milliunits
     # currency: str
     # extra_info: str
     payee: str
@@ -1,11 +1,14 @@
 import csv
 import io
 import json
-from typing import List
+from typing import Iterable, Iterator, List
 
 from rich.console import Console
 from rich.table import Table
 
+from .. import ofx
+from ..amounts import format_milliunits, from_milliunits
+from ..models import Record
 from .models import Transaction
 
 
@@ -42,7 +45,7 @@ class TransactionsOutput:
                 transaction.state,
                 transaction.kind,
                 str(transaction.date),
-                str(transaction.amount),
+                format_milliunits(transaction.amount),
                 # transaction.currency,
                 # transaction.extra_info,
             )
@@ -62,12 +65,12 @@ class TransactionsOutput:
         
         writer = csv.writer(output)
         writer.writerow(["Date", "Payee", "Memo", "Amount"])
-        for transaction in transactions:
+        for record in self.records(transactions):
             writer.writerow([
-                transaction.date.strftime("%m/%d/%Y"),
-                transaction.payee,
-                transaction.name,
-                str(transaction.amount),
+                record.date.strftime("%m/%d/%Y"),
+                record.payee,
+                record.memo,
+                format_milliunits(record.amount),
             ])
 
         return output.getvalue()
@@ -76,6 +79,21 @@ class TransactionsOutput:
         """Renders the transactions as a JSON string."""
         return json.dumps(transactions, cls=TransactionEncoder, indent=4)
 
+    def ofx(self, transactions: List[Transaction]) -> Iterator[str]:
+        """Renders the transactions as an OFX statement, one chunk at a time."""
+        start, end = ofx.date_range(self.records(transactions))
+        return ofx.statement(self.records(transactions), start, end)
+
+    def records(self, transactions: Iterable[Transaction]) -> Iterator[Record]:
+        """Map the transactions to the fields YNAB imports."""
+        for transaction in transactions:
+            yield Record(
+                date=transaction.date,
+                payee=transaction.payee,
+                memo=transaction.name,
+                amount=transaction.amount,
+            )
+
 
 class TransactionEncoder(json.JSONEncoder):
     def default(self, obj: Transaction):
@@ -84,6 +102,6 @@ class TransactionEncoder(json.JSONEncoder):
             "state": obj.state,
             "kind": obj.kind,
             "date": obj.date.isoformat(),
-            "amount": obj.amount,
+            "amount": from_milliunits(obj.amount),
             "payee": obj.payee,
         }
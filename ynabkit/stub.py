@@ -0,0 +1,125 @@
+import argparse
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+TRANSACTIONS_PATH = re.compile(r"/v1/budgets/([^/]+)/transactions")
+
+
+class StubServer(ThreadingHTTPServer):
+    """Serve the YNAB endpoint creating transactions, and record every request.
+
+    Transactions are kept by import_id, so pushing the same ones again
+    reports them as duplicates, like YNAB does. `failures` lists the status
+    codes to answer the next requests with, e.g. [429] to rate limit the
+    first one.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), failures: List[int] = None):
+        super().__init__(address, StubHandler)
+        self.requests = []
+        self.transactions = {}
+        self.failures = list(failures or [])
+        # Client ports seen, one per connection opened
+        self.connections = set()
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests.append(dict(
+                method="POST",
+                path=self.path,
+                headers=dict(self.headers),
+                body=json.loads(body) if body else None,
+            ))
+            failure = server.failures.pop(0) if server.failures else None
+
+        if failure:
+            return self._reply(failure, {"error": {"id": str(failure), "name": "stub_failure", "detail": "Injected failure"}}, {"Retry-After": "0"})
+
+        if not TRANSACTIONS_PATH.fullmatch(self.path):
+            return self._reply(404, {"error": {"id": "404", "name": "not_found", "detail": "Not found"}})
+
+        if self.headers.get("Authorization", "").partition(" ")[2] == "":
+            return self._reply(401, {"error": {"id": "401", "name": "unauthorized", "detail": "Unauthorized"}})
+
+        transaction_ids = []
+        duplicate_import_ids = []
+        with server.lock:
+            for transaction in json.loads(body)["transactions"]:
+                import_id = transaction.get("import_id")
+                if import_id and import_id in server.transactions:
+                    duplicate_import_ids.append(import_id)
+                    continue
+                transaction = dict(transaction, id=str(uuid.uuid4()))
+                server.transactions[import_id or transaction["id"]] = transaction
+                transaction_ids.append(transaction["id"])
+
+        self._reply(201, {"data": {
+            "transaction_ids": transaction_ids,
+            "duplicate_import_ids": duplicate_import_ids,
+        }})
+
+    def _reply(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the YNAB API, to try push without touching a real budget")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = StubServer((args.host, args.port))
+    print(f"Serving the YNAB stub on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Received {len(server.requests)} requests, created {len(server.transactions)} transactions")
+
+
+if __name__ == "__main__":
+    main()
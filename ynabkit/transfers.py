@@ -0,0 +1,92 @@
+import dataclasses
+from typing import Dict, Iterable, List, Tuple
+
+from .models import Record
+
+# Days between the two sides of a transfer, e.g. an N26 transfer and the
+# Fineco credit booked a day or two later.
+WINDOW_DAYS = 2
+
+# YNAB imports a transaction as a transfer when its payee names the other
+# account this way.
+TRANSFER_PAYEE = "Transfer : {account}"
+
+
+def match_transfers(records: Iterable[Record], window_days: int = WINDOW_DAYS) -> List[Tuple[int, int]]:
+    """Pair the records moving money between two sources.
+
+    An outflow pairs with an inflow of the same amount from another source,
+    dated at most window_days apart. Outflows and inflows are sorted on
+    (amount, day) and joined in a single merge pass: within the records
+    of an amount, a pointer skips the inflows too early for the current
+    outflow, so only the inflows inside its window are looked at. Each
+    outflow takes the earliest inflow left in its window.
+
+    Returns the (outflow, inflow) pairs of indexes in records.
+    """
+    records = list(records)
+    outflows = sorted((-r.amount, r.date.toordinal(), i) for i, r in enumerate(records) if r.amount < 0)
+    inflows = sorted((r.amount, r.date.toordinal(), i) for i, r in enumerate(records) if r.amount > 0)
+
+    pairs = []
+    o = i = 0
+    while o < len(outflows) and i < len(inflows):
+        amount = outflows[o][0]
+        if amount < inflows[i][0]:
+            o += 1
+        elif amount > inflows[i][0]:
+            i += 1
+        else:
+            o_end = o
+            while o_end < len(outflows) and outflows[o_end][0] == amount:
+                o_end += 1
+            i_end = i
+            while i_end < len(inflows) and inflows[i_end][0] == amount:
+                i_end += 1
+
+            pairs.extend(_match_amount(records, outflows[o:o_end], inflows[i:i_end], window_days))
+            o, i = o_end, i_end
+
+    return sorted(pairs)
+
+
+def _match_amount(records: List[Record], outflows: list, inflows: list, window_days: int) -> List[Tuple[int, int]]:
+    """Pair outflows and inflows of the same amount, both sorted by day"""
+    pairs = []
+    matched = set()
+    start = 0
+    for _, day, outflow in outflows:
+        while start < len(inflows) and inflows[start][1] < day - window_days:
+            start += 1
+
+        for k in range(start, len(inflows)):
+            _, inflow_day, inflow = inflows[k]
+            if inflow_day > day + window_days:
+                break
+            if inflow not in matched and records[inflow].source != records[outflow].source:
+                matched.add(inflow)
+                pairs.append((outflow, inflow))
+                break
+
+    return pairs
+
+
+def mark_transfers(records: Iterable[Record], window_days: int = WINDOW_DAYS, accounts: Dict[str, str] = None) -> List[Record]:
+    """Return the records with the YNAB transfer payee set on both sides of each transfer.
+
+    accounts maps source names to the names of their YNAB accounts; sources
+    not listed go by their own name.
+    """
+    records = list(records)
+    accounts = accounts or {}
+
+    for outflow, inflow in match_transfers(records, window_days):
+        out_record, in_record = records[outflow], records[inflow]
+        records[outflow] = dataclasses.replace(
+            out_record, payee=TRANSFER_PAYEE.format(account=accounts.get(in_record.source, in_record.source))
+        )
+        records[inflow] = dataclasses.replace(
+            in_record, payee=TRANSFER_PAYEE.format(account=accounts.get(out_record.source, out_record.source))
+        )
+
+    return records
@@ -0,0 +1,219 @@
+import datetime
+import posixpath
+import re
+import zipfile
+from typing import Iterator, List, Optional, Set
+from xml.etree import ElementTree
+from xml.etree.ElementTree import iterparse
+
+# Engines reading .xlsx workbooks: openpyxl, or the iterparse reader below,
+# which is faster and lighter but only reads cell values.
+ENGINES = ["openpyxl", "iterparse"]
+
+MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIPS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Built-in number formats showing dates or times.
+DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+
+# Date and time placeholders in a custom number format, once literal text,
+# colours and conditions are removed.
+DATE_FORMAT_CODE = re.compile(r"[dmyhs]", re.IGNORECASE)
+FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+
+EPOCH_1900 = datetime.datetime(1899, 12, 30)
+EPOCH_1904 = datetime.datetime(1904, 1, 1)
+
+
+def read_rows(file_name: str, min_row: int = 1, max_col: int = None, engine: str = "openpyxl") -> Iterator[tuple]:
+    """Yield the cell values of the active sheet, one tuple per row, with the given engine"""
+    if engine == "iterparse":
+        return iter_rows(file_name, min_row=min_row, max_col=max_col)
+    if engine == "openpyxl":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(filename=file_name)
+        return workbook.active.iter_rows(min_row=min_row, max_col=max_col, values_only=True)
+    raise ValueError(f"Unknown engine {engine!r}: expected one of {', '.join(ENGINES)}")
+
+
+def iter_rows(file_name: str, min_row: int = 1, max_col: int = None) -> Iterator[tuple]:
+    """Yield the cell values of the active sheet, reading its XML straight from the workbook.
+
+    The sheet is parsed incrementally and each row is dropped once yielded,
+    so memory does not grow with the number of rows. Values match those of
+    openpyxl's iter_rows(values_only=True): shared and inline strings, ints,
+    floats, booleans, and datetimes for numbers formatted as dates. Rows
+    have max_col values (or as many as the widest row read so far), missing
+    rows and cells are None.
+    """
+    with zipfile.ZipFile(file_name) as archive:
+        sheet, date1904 = _active_sheet(archive)
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+        epoch = EPOCH_1904 if date1904 else EPOCH_1900
+
+        width = max_col or 0
+        next_row = 1
+        sheet_data = None
+        with archive.open(sheet) as f:
+            for event, element in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if element.tag == f"{MAIN}sheetData":
+                        sheet_data = element
+                    continue
+                if element.tag != f"{MAIN}row":
+                    continue
+
+                number = int(element.get("r") or next_row)
+                values = _row_values(element, strings, date_styles, epoch, max_col)
+                # A cleared row would still hang from <sheetData>
+                sheet_data.remove(element)
+                if not max_col:
+                    width = max(width, len(values))
+
+                # Rows with no cells are not stored in the sheet
+                for empty in range(max(next_row, min_row), number):
+                    yield (None,) * width
+                next_row = number + 1
+
+                if number >= min_row:
+                    yield tuple(values) + (None,) * (width - len(values))
+
+
+def _row_values(row, strings: List[str], date_styles: Set[int], epoch: datetime.datetime, max_col: Optional[int]) -> list:
+    values = []
+    for cell in row.iter(f"{MAIN}c"):
+        reference = cell.get("r")
+        column = _column_index(reference) if reference else len(values) + 1
+        if max_col and column > max_col:
+            continue
+
+        values.extend([None] * (column - 1 - len(values)))
+        values.append(_cell_value(cell, strings, date_styles, epoch))
+
+    return values
+
+
+def _cell_value(cell, strings: List[str], date_styles: Set[int], epoch: datetime.datetime):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        inline = cell.find(f"{MAIN}is")
+        return _text(inline) if inline is not None else None
+
+    value = cell.findtext(f"{MAIN}v")
+    if value is None:
+        return None
+
+    if kind == "s":
+        return strings[int(value)]
+    if kind in ("str", "e"):
+        return value
+    if kind == "b":
+        return value == "1"
+    if kind == "d":
+        return datetime.datetime.fromisoformat(value)
+
+    number = float(value) if any(c in value for c in ".eE") else int(value)
+    if int(cell.get("s", 0)) in date_styles:
+        return _from_serial(number, epoch)
+    return number
+
+
+def _from_serial(serial: float, epoch: datetime.datetime):
+    """Convert a date serial number to a datetime, or a time if below one day, as openpyxl does"""
+    day, fraction = divmod(serial, 1)
+    # Rounded to the millisecond, the precision of the serial numbers
+    time = datetime.timedelta(milliseconds=round(fraction * 86_400_000))
+    if 0 <= serial < 1 and time.days == 0:
+        return (datetime.datetime.min + time).time()
+    # The 1900 system counts a 29 February 1900 that never was: the epoch
+    # accounts for it, except in the first two months
+    if 0 < serial < 60 and epoch == EPOCH_1900:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + time
+
+
+def _column_index(reference: str) -> int:
+    """Return the 1-based column of a cell reference like "AB12" """
+    index = 0
+    for char in reference:
+        if char.isdigit():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index
+
+
+def _text(element) -> str:
+    """Return the text of a string item: plain, or rich text runs (phonetic hints excluded)"""
+    text = element.findtext(f"{MAIN}t")
+    if text is not None:
+        return text
+    return "".join(run.findtext(f"{MAIN}t") or "" for run in element.iter(f"{MAIN}r"))
+
+
+def _active_sheet(archive: zipfile.ZipFile):
+    """Return the path of the active sheet in the archive, and whether the workbook uses the 1904 date system"""
+    workbook = _parse(archive, "xl/workbook.xml")
+
+    properties = workbook.find(f"{MAIN}workbookPr")
+    date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+
+    view = workbook.find(f"{MAIN}bookViews/{MAIN}workbookView")
+    active = int(view.get("activeTab", 0)) if view is not None else 0
+    sheets = workbook.findall(f"{MAIN}sheets/{MAIN}sheet")
+    relationship = sheets[min(active, len(sheets) - 1)].get(f"{RELATIONSHIPS}id")
+
+    for rel in _parse(archive, "xl/_rels/workbook.xml.rels").iter(f"{PACKAGE_RELATIONSHIPS}Relationship"):
+        if rel.get("Id") == relationship:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/"), date1904
+            return posixpath.normpath(posixpath.join("xl", target)), date1904
+
+    raise ValueError(f"Sheet {relationship} not found in the workbook relationships")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+
+    strings = []
+    table = None
+    with archive.open("xl/sharedStrings.xml") as f:
+        for event, element in iterparse(f, events=("start", "end")):
+            if event == "start":
+                if table is None:
+                    table = element  # <sst>
+            elif element.tag == f"{MAIN}si":
+                strings.append(_text(element))
+                table.remove(element)
+    return strings
+
+
+def _date_styles(archive: zipfile.ZipFile) -> Set[int]:
+    """Return the indexes of the cell styles whose number format shows a date"""
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+
+    styles = _parse(archive, "xl/styles.xml")
+    date_formats = set(DATE_FORMAT_IDS)
+    for number_format in styles.iter(f"{MAIN}numFmt"):
+        code = FORMAT_LITERALS.sub("", number_format.get("formatCode", ""))
+        if DATE_FORMAT_CODE.search(code):
+            date_formats.add(int(number_format.get("numFmtId")))
+
+    cell_formats = styles.find(f"{MAIN}cellXfs")
+    if cell_formats is None:
+        return set()
+    return {
+        index
+        for index, style in enumerate(cell_formats.findall(f"{MAIN}xf"))
+        if int(style.get("numFmtId", 0)) in date_formats
+    }
+
+
+def _parse(archive: zipfile.ZipFile, name: str):
+    with archive.open(name) as f:
+        return ElementTree.parse(f).getroot()
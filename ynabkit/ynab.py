@@ -0,0 +1,234 @@
+import dataclasses
+import http.client
+import json
+import queue
+import random
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .models import Record
+
+API_URL = "https://api.ynab.com/v1"
+
+# Transactions sent in a single bulk request.
+BATCH_SIZE = 200
+
+# Requests in flight at the same time, which is also the number of
+# connections kept open.
+CONCURRENCY = 4
+
+# Limits of the YNAB API on transaction fields.
+PAYEE_NAME_MAX_LENGTH = 50
+MEMO_MAX_LENGTH = 200
+
+# Status codes worth retrying: rate limited, or the server is in trouble.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class YNABError(Exception):
+    """Raised when the YNAB API rejects a request, or keeps failing after the retries"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclasses.dataclass
+class PushResult:
+    """What YNAB did with the transactions pushed"""
+    created: int = 0
+    # Transactions YNAB already had, recognised by their import_id
+    duplicates: int = 0
+    batches: int = 0
+
+
+def import_ids(records: Iterable[Record]) -> Iterator[str]:
+    """Yield the import_id of each record, in the format YNAB uses for file imports.
+
+    The id is YNAB:<milliunits>:<date>:<occurrence>, where occurrence counts
+    the records with the same amount on the same date, starting from 1. The
+    same file always gives the same ids, so pushing it again creates no
+    duplicates.
+    """
+    occurrences = defaultdict(int)
+    for record in records:
+        key = (record.amount, record.date.date())
+        occurrences[key] += 1
+        yield f"YNAB:{record.amount}:{record.date.date().isoformat()}:{occurrences[key]}"
+
+
+def transaction_payload(record: Record, account_id: str, import_id: str) -> dict:
+    """Return the YNAB API payload creating the transaction of a record"""
+    return {
+        "account_id": account_id,
+        "date": record.date.date().isoformat(),
+        "amount": record.amount,
+        "payee_name": record.payee[:PAYEE_NAME_MAX_LENGTH] if record.payee else None,
+        "memo": (record.memo or "")[:MEMO_MAX_LENGTH] or None,
+        "cleared": "cleared",
+        "approved": False,
+        "import_id": import_id,
+    }
+
+
+def batches(items: List, size: int) -> Iterator[List]:
+    """Split items in lists of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ConnectionPool:
+    """A fixed set of keep-alive HTTP connections to a single host.
+
+    Each request takes a connection from the pool and puts it back when the
+    response has been read, so consecutive requests reuse the TCP (and TLS)
+    connection instead of opening a new one.
+    """
+
+    def __init__(self, url: str, size: int = CONCURRENCY, timeout: float = 30):
+        parsed = urllib.parse.urlsplit(url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._connections = queue.LifoQueue()
+        for _ in range(size):
+            self._connections.put(None)  # opened on first use
+
+    def request(self, method: str, path: str, body: bytes = None, headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return the status, headers and body of the response"""
+        connection = self._connections.get()
+        try:
+            if connection is None:
+                connection = self._connect()
+            try:
+                connection.request(method, self.path + path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                # The server may have closed an idle connection: open a new
+                # one on the next request
+                connection.close()
+                connection = None
+                raise
+
+            if response.will_close:
+                connection.close()
+                connection = None
+
+            return response.status, dict(response.getheaders()), data
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        """Close every open connection"""
+        while not self._connections.empty():
+            connection = self._connections.get()
+            if connection is not None:
+                connection.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+class Client:
+    """Create transactions through the YNAB API.
+
+    Transactions are sent in bulk requests of at most `batch_size`, with up
+    to `concurrency` requests in flight over a pool of keep-alive
+    connections. Rate limited requests, server errors and network errors
+    are retried up to `retries` times, waiting `backoff` seconds doubled on
+    each attempt (or what the Retry-After header asks for).
+    """
+
+    def __init__(
+        self,
+        token: str,
+        url: str = API_URL,
+        batch_size: int = BATCH_SIZE,
+        concurrency: int = CONCURRENCY,
+        retries: int = 5,
+        backoff: float = 1.0,
+    ):
+        self.token = token
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ConnectionPool(url, size=concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pool.close()
+
+    def create_transactions(self, budget_id: str, transactions: List[dict]) -> PushResult:
+        """Create the transactions in the budget, skipping those YNAB already imported"""
+        path = f"/budgets/{urllib.parse.quote(budget_id, safe='')}/transactions"
+
+        result = PushResult()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            responses = executor.map(
+                lambda batch: self._post(path, {"transactions": batch}),
+                batches(transactions, self.batch_size),
+            )
+            for response in responses:
+                data = response.get("data", {})
+                result.created += len(data.get("transaction_ids") or [])
+                result.duplicates += len(data.get("duplicate_import_ids") or [])
+                result.batches += 1
+
+        return result
+
+    def _post(self, path: str, payload: dict) -> dict:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                status, response_headers, data = self.pool.request("POST", path, body, headers)
+            except (http.client.HTTPException, OSError) as e:
+                error = YNABError(f"Request to YNAB failed: {e}")
+            else:
+                if 200 <= status < 300:
+                    return json.loads(data)
+
+                error = YNABError(f"YNAB returned {status}: {_error_detail(data)}", status)
+                if status not in RETRY_STATUSES:
+                    raise error
+                retry_after = response_headers.get("Retry-After")
+
+            if attempt == self.retries:
+                raise error
+            time.sleep(_delay(retry_after, self.backoff * 2 ** attempt))
+            attempt += 1
+
+
+def _delay(retry_after: str, backoff: float) -> float:
+    """Return how long to wait before retrying: what Retry-After asks, or the backoff with some jitter"""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return backoff * random.uniform(0.5, 1.5)
+
+
+def _error_detail(data: bytes) -> str:
+    try:
+        return json.loads(data)["error"]["detail"]
+    except (ValueError, KeyError, TypeError):
+        return data.decode("utf-8", "replace")[:200]